@@ -1,12 +1,19 @@
-from .download import download_image
+from .download import download_image, save_base64_image
+from .batch import JobResult, run_batch
+from .concurrency import AdaptiveLimiter, configure_concurrency
 from .generate import generate_image
+from .hedge import HedgePolicy
 from .remove_background import remove_background
+from .sinks import LocalDirSink, OutputSink, S3Sink, StdoutSink, sink_from_uri
+from .timeouts import Deadline, DeadlineExceeded, build_timeout
+from .token_pool import TokenPool, TokenPoolExhausted
 from .upscale import (
     clarity_upscale,
     generative_upscale,
     upscale_image,
 )
 from .vectorize import vectorize_image
+from .workers import configure_workers, run_cpu
 
 __all__ = [
     "vectorize_image",
@@ -16,4 +23,22 @@ __all__ = [
     "generative_upscale",
     "generate_image",
     "download_image",
+    "save_base64_image",
+    "HedgePolicy",
+    "Deadline",
+    "DeadlineExceeded",
+    "build_timeout",
+    "run_batch",
+    "JobResult",
+    "AdaptiveLimiter",
+    "configure_concurrency",
+    "configure_workers",
+    "run_cpu",
+    "TokenPool",
+    "TokenPoolExhausted",
+    "OutputSink",
+    "LocalDirSink",
+    "StdoutSink",
+    "S3Sink",
+    "sink_from_uri",
 ]
@@ -1,135 +1,279 @@
 import asyncio
+import contextlib
 import math
+import os
+import threading
 import time
-from typing import Any, Dict, Optional, Union
+from typing import IO, Any, Dict, Iterator, Optional, Tuple, Union
 
-import click
 import httpx
 from tqdm import tqdm
 
+from .client import get_client
+from .concurrency import get_limiter
+from .progress import active_progress, echo_status
+from .timeouts import (
+    DEFAULT_TIMEOUT,
+    Deadline,
+    DeadlineExceeded,
+    TimeoutTypes,
+    clamp_timeout,
+    enforce_deadline,
+)
+from .token_pool import TokenPool
+
+# An image to upload: a path on disk or an already open binary stream
+ImageSource = Union[str, IO[bytes]]
+
+
+class _UnsizedReader:
+    """
+    Read-only view of a binary stream.
+
+    Hiding fileno/seek/tell stops httpx from measuring pipes (which report a
+    zero size) so the upload is streamed with chunked transfer encoding.
+    """
+
+    def __init__(self, stream: IO[bytes]):
+        self._stream = stream
+
+    def read(self, size: int = -1) -> bytes:
+        return self._stream.read(size)
+
+
+@contextlib.contextmanager
+def open_upload(
+    source: ImageSource,
+) -> Iterator[Union[IO[bytes], Tuple[str, _UnsizedReader]]]:
+    """
+    Prepare an image source for a multipart upload.
+
+    Args:
+        source (ImageSource): Path to the image file, or a binary stream such as stdin
+
+    Yields:
+        The value for the "file" multipart field
+    """
+    if isinstance(source, str):
+        with open(source, "rb") as file:
+            yield file
+        return
+    name = getattr(source, "name", None)
+    if not isinstance(name, str) or name.startswith("<"):
+        name = "image"
+    yield (os.path.basename(name), _UnsizedReader(source))
+
 
 async def async_api_call(
-    file_path: str,
+    file_path: ImageSource,
     endpoint: str,
     api_token: str,
     response_format: Optional[str] = None,
-    timeout: int = 30,
+    timeout: TimeoutTypes = DEFAULT_TIMEOUT,
+    deadline: Optional[Deadline] = None,
 ) -> Union[str, Dict[str, Any]]:
     """
     Async API call for image processing with progress tracking.
 
+    Runs api_call() in a worker thread, so async callers share its pooled
+    client, concurrency limits and progress reporting.
+
     Args:
-        file_path (str): Path to the image file
+        file_path (ImageSource): Path to the image file, or a binary stream
         endpoint (str): API endpoint URL
         api_token (str): Authentication token
         response_format (str, optional): Format of the response. Defaults to None (url).
-        timeout (int, optional): Timeout for the API request. Defaults to 30 seconds.
+        timeout (TimeoutTypes, optional): Timeout for the API request, in seconds or per phase. Defaults to 60 seconds.
+        deadline (Deadline, optional): End-to-end deadline for the request.
 
     Returns:
         Union[str, Dict[str, Any]]: Processed image URL or base64 JSON
     """
-    async with httpx.AsyncClient() as client:
-        # Prepare the request
-        with open(file_path, "rb") as file:
-            files = {"file": file}
-            headers = {
-                "Authorization": f"Bearer {api_token}",
-            }
-            params = {}
-            if response_format:
-                params["response_format"] = response_format
-
-            # Create a progress bar for image processing with continuous updates
-            with tqdm(
-                total=100, desc="Processing Image", bar_format="{l_bar}{bar}"
-            ) as pbar:
-                start_time = time.time()
-
-                # Simulate continuous progress while waiting for the API
-                def update_progress():
-                    elapsed = time.time() - start_time
-                    # Asymptotic progress that approaches 90% but never quite reaches it
-                    progress = min(90, 50 * (1 - math.exp(-0.2 * elapsed)))
-                    pbar.n = progress
-                    pbar.refresh()
-
-                # Start a background task for progress updates
-                async def progress_task():
-                    while pbar.n < 90:
-                        update_progress()
-                        await asyncio.sleep(0.5)
-
-                # Make the actual API request
-                try:
-                    # Start progress tracking
-                    progress_coro = asyncio.create_task(progress_task())
-
-                    # Send the request
-                    response = await client.post(
-                        endpoint,
-                        headers=headers,
-                        files=files,
-                        params=params,
-                        timeout=timeout,
-                    )
-                    response.raise_for_status()
-
-                    # Cancel progress task
-                    progress_coro.cancel()
-
-                    # Ensure progress bar reaches 100%
-                    pbar.n = 100
-                    pbar.refresh()
-
-                    # Return the image URL or base64 JSON based on response format
-                    response_data = response.json()
-                    return (
-                        response_data["image"]["url"]
-                        if "url" in response_data["image"]
-                        else response_data
-                    )
-
-                except Exception:
-                    # Cancel progress task in case of any exception
-                    progress_coro.cancel()
-                    raise
+    return await asyncio.to_thread(
+        api_call, file_path, endpoint, api_token, response_format, timeout, deadline
+    )
+
+
+@contextlib.contextmanager
+def simulated_progress(desc: str) -> Iterator[None]:
+    """
+    Show a progress bar that creeps forward while a blocking request runs.
+
+    The API gives no progress information, so the bar approaches 90%
+    asymptotically and jumps to 100% when the block completes successfully.
+
+    While a batch dashboard is shown, no bar is drawn and the request latency
+    is reported to the dashboard instead.
+
+    Args:
+        desc (str): Progress bar description
+    """
+    dashboard = active_progress()
+    if dashboard is not None:
+        start_time = time.monotonic()
+        yield
+        dashboard.record_request(time.monotonic() - start_time)
+        return
+
+    with tqdm(total=100, desc=desc, bar_format="{l_bar}{bar}") as pbar:
+        start_time = time.time()
+
+        # Simulate continuous progress while waiting for the API
+        def update_progress():
+            elapsed = time.time() - start_time
+            # Asymptotic progress that approaches 90% but never quite reaches it
+            progress = min(90, 50 * (1 - math.exp(-0.2 * elapsed)))
+            pbar.n = progress
+            pbar.refresh()
+
+        # Start a background thread for progress updates
+        stop_event = threading.Event()
+
+        def progress_thread():
+            while not stop_event.is_set():
+                update_progress()
+                stop_event.wait(0.5)
+
+        progress_updater = threading.Thread(target=progress_thread, daemon=True)
+        progress_updater.start()
+
+        try:
+            yield
+        finally:
+            # Stop the progress thread, whether or not the request succeeded
+            stop_event.set()
+            progress_updater.join()
+
+        # Ensure progress bar reaches 100%
+        pbar.n = 100
+        pbar.refresh()
+
+
+def api_call(
+    file_path: ImageSource,
+    endpoint: str,
+    api_token: str,
+    response_format: Optional[str] = None,
+    timeout: TimeoutTypes = DEFAULT_TIMEOUT,
+    deadline: Optional[Deadline] = None,
+    operation_name: str = "Processing Image",
+) -> Union[str, Dict[str, Any]]:
+    """
+    Blocking API call for image processing with progress tracking.
+
+    Uses the shared client, so the request goes out on a pooled (possibly
+    pre-warmed) connection, once the endpoint's adaptive concurrency limit
+    allows.
+
+    Args:
+        file_path (ImageSource): Path to the image file, or a binary stream
+        endpoint (str): API endpoint URL
+        api_token (str): Authentication token
+        response_format (str, optional): Format of the response. Defaults to None (url).
+        timeout (TimeoutTypes, optional): Timeout for the API request, in seconds or per phase. Defaults to 60 seconds.
+        deadline (Deadline, optional): End-to-end deadline for the request.
+        operation_name (str, optional): Progress bar description. Defaults to "Processing Image".
+
+    Returns:
+        Union[str, Dict[str, Any]]: Processed image URL or base64 JSON
+    """
+    headers = {
+        "Authorization": f"Bearer {api_token}",
+    }
+    params = {}
+    if response_format:
+        params["response_format"] = response_format
+
+    with open_upload(file_path) as file, simulated_progress(operation_name):
+        # Wait for a slot under the endpoint's adaptive concurrency limit
+        with get_limiter(endpoint).slot(deadline):
+            with enforce_deadline(deadline):
+                response = get_client().post(
+                    endpoint,
+                    headers=headers,
+                    files={"file": file},
+                    params=params,
+                    timeout=clamp_timeout(timeout, deadline),
+                )
+            response.raise_for_status()
+
+    # Return the image URL or base64 JSON based on response format
+    response_data = response.json()
+    return (
+        response_data["image"]["url"]
+        if "url" in response_data["image"]
+        else response_data
+    )
 
 
 def process_image(
-    file_path: str,
+    file_path: ImageSource,
     endpoint: str,
     operation_name: str,
     response_format: Optional[str] = None,
-    timeout: int = 30,
+    timeout: TimeoutTypes = DEFAULT_TIMEOUT,
+    deadline: Optional[Deadline] = None,
+    token_pool: Optional[TokenPool] = None,
 ) -> Optional[Union[str, Dict[str, Any]]]:
     """
-    Synchronous wrapper for async API call.
+    Synchronous API call that reports errors instead of raising them.
 
     Args:
-        file_path (str): Path to the image file
+        file_path (ImageSource): Path to the image file, or a binary stream
         endpoint (str): API endpoint URL
         operation_name (str): Name of the operation for progress description
         response_format (str, optional): Format of the response. Defaults to None (url).
-        timeout (int, optional): Timeout for the API request. Defaults to 30 seconds.
+        timeout (TimeoutTypes, optional): Timeout for the API request, in seconds or per phase. Defaults to 60 seconds.
+        deadline (Deadline, optional): End-to-end deadline for the request.
+        token_pool (TokenPool, optional): Tokens to spread requests over. Defaults to the stored token.
 
     Returns:
         Optional[Union[str, Dict[str, Any]]]: Processed image URL or base64 JSON, or None if processing fails
+
+    Raises:
+        DeadlineExceeded: If the deadline runs out, so batch callers can reschedule the job
     """
-    from ..commands.token import ensure_token
+    from ..commands.token import DEFAULT_PROFILE, ensure_token
 
     try:
-        api_token = ensure_token()
-        return asyncio.run(
-            async_api_call(file_path, endpoint, api_token, response_format, timeout)
+        if token_pool is None:
+            token_pool = TokenPool({DEFAULT_PROFILE: ensure_token()})
+
+        # A retry on another token must upload the image again: rewind seekable
+        # streams, and never retry one-shot streams such as a piped stdin
+        start = None
+        if not isinstance(file_path, str) and file_path.seekable():
+            start = file_path.tell()
+
+        def request(api_token: str) -> Union[str, Dict[str, Any]]:
+            if start is not None:
+                file_path.seek(start)
+            return api_call(
+                file_path,
+                endpoint,
+                api_token,
+                response_format,
+                timeout,
+                deadline,
+                operation_name,
+            )
+
+        return token_pool.call(
+            request,
+            deadline=deadline,
+            retry=isinstance(file_path, str) or start is not None,
         )
+    except DeadlineExceeded:
+        raise
     except httpx.HTTPStatusError as exc:
-        click.echo(
-            f"\nHTTP error occurred: {exc.response.status_code} - {exc.response.text}"
+        echo_status(
+            f"\nHTTP error occurred: {exc.response.status_code} - {exc.response.text}",
+            err=True,
         )
         return None
     except httpx.RequestError as exc:
-        click.echo(f"\nRequest error occurred: {exc}")
+        echo_status(f"\nRequest error occurred: {exc}", err=True)
         return None
     except Exception as exc:
-        click.echo(f"\nUnexpected error occurred: {exc}")
+        echo_status(f"\nUnexpected error occurred: {exc}", err=True)
         return None
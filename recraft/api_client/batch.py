@@ -0,0 +1,88 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Generic, Iterable, List, Optional, TypeVar
+
+from .progress import BatchProgress
+from .timeouts import Deadline, DeadlineExceeded
+
+T = TypeVar("T")
+
+
+class JobResult(Generic[T]):
+    """Outcome of one job in a batch."""
+
+    def __init__(self, item: T):
+        self.item = item
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        self.attempts = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.value is not None
+
+
+def run_batch(
+    items: Iterable[T],
+    job: Callable[[T, Deadline], Any],
+    concurrency: int = 4,
+    job_timeout: Optional[float] = None,
+    batch_timeout: Optional[float] = None,
+    retries: int = 1,
+    progress: Optional[BatchProgress] = None,
+) -> List[JobResult[T]]:
+    """
+    Run a job for each item on a thread pool, under per-job and per-batch deadlines.
+
+    Each job receives a Deadline that starts when the job starts and never outlives
+    the batch deadline. A job cut off by its deadline frees its slot and is
+    rescheduled at the back of the queue, up to `retries` times, while the batch
+    deadline allows.
+
+    Args:
+        items (Iterable[T]): Items to process
+        job (Callable[[T, Deadline], Any]): Processes one item. A None result counts as a failure.
+        concurrency (int, optional): Number of jobs run at once. Defaults to 4.
+        job_timeout (float, optional): Time budget per job attempt in seconds. Defaults to unlimited.
+        batch_timeout (float, optional): Time budget for the whole batch in seconds. Defaults to unlimited.
+        retries (int, optional): Reschedules allowed per job after a deadline cut-off. Defaults to 1.
+        progress (BatchProgress, optional): Dashboard to report job progress to.
+
+    Returns:
+        List[JobResult[T]]: One result per item, in input order
+    """
+    batch_deadline = Deadline(batch_timeout)
+    results = [JobResult(item) for item in items]
+
+    def attempt(result: JobResult[T]) -> Any:
+        if progress is not None:
+            progress.job_started()
+        batch_deadline.check()
+        return job(result.item, batch_deadline.child(job_timeout))
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+
+        def submit(result: JobResult[T]):
+            result.attempts += 1
+            return executor.submit(attempt, result)
+
+        futures = {submit(result): result for result in results}
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = futures.pop(future)
+                try:
+                    result.value = future.result()
+                    result.error = None
+                except DeadlineExceeded as exc:
+                    result.error = exc
+                    if result.attempts <= retries and not batch_deadline.expired:
+                        futures[submit(result)] = result
+                        if progress is not None:
+                            progress.job_requeued()
+                        continue
+                except Exception as exc:
+                    result.error = exc
+                if progress is not None:
+                    progress.job_finished(result.ok)
+
+    return results
@@ -0,0 +1,66 @@
+import threading
+from typing import Optional
+
+import httpx
+
+API_BASE_URL = "https://external.api.recraft.ai"
+# Keep idle connections long enough to outlast interactive prompts, so the one
+# opened by prewarm() is still there for the first real request. Connections
+# the server has closed meanwhile are detected and replaced by the pool.
+KEEPALIVE_EXPIRY = 300.0
+
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> httpx.Client:
+    """
+    Return the process-wide HTTP client.
+
+    Sharing one client keeps connections alive between requests, so a connection
+    opened by prewarm() or an earlier request is reused instead of paying for
+    DNS, TCP and TLS again.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=20,
+                    keepalive_expiry=KEEPALIVE_EXPIRY,
+                )
+            )
+        return _client
+
+
+def prewarm(*urls: str) -> threading.Thread:
+    """
+    Warm up the token and connections in the background.
+
+    Looks up the stored API token and opens a pooled connection to each URL
+    (defaulting to the API host) while the user is still answering prompts.
+    Failures are ignored: the real request will report them.
+
+    Args:
+        *urls (str): URLs whose hosts should have a warm connection
+
+    Returns:
+        threading.Thread: The daemon thread doing the work
+    """
+    from ..commands.token import prefetch_token
+
+    prefetch_token()
+
+    def warm():
+        client = get_client()
+        for url in urls or (API_BASE_URL,):
+            try:
+                # Any response will do, the point is the pooled connection
+                client.head(url, timeout=10)
+            except httpx.HTTPError:
+                pass
+
+    thread = threading.Thread(target=warm, name="recraft-prewarm", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,219 @@
+import contextlib
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterator, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from .timeouts import Deadline, DeadlineExceeded
+
+DEFAULT_CONCURRENCY = 4
+
+# Limits given to limiters created from now on, set by configure_concurrency()
+_initial_limit = DEFAULT_CONCURRENCY
+_max_limit = DEFAULT_CONCURRENCY
+_limiters: Dict[str, "AdaptiveLimiter"] = {}
+_limiters_lock = threading.Lock()
+
+
+class _Ticket:
+    def __init__(self, epoch: int):
+        self.epoch = epoch
+        self.status: Optional[int] = None
+        self.congested = False
+
+
+class AdaptiveLimiter:
+    """
+    AIMD limit on the number of requests in flight to one endpoint.
+
+    Every successful request with flat latency grows the limit by about one
+    request per round trip (additive increase). A 429, a 5xx, a network
+    timeout or a sustained rise in latency halves it (multiplicative
+    decrease). Only requests started since the last decrease can trigger
+    another one, so one burst of errors costs a single halving.
+
+    Latency counts as risen when its short-term average stays above a multiple
+    of the median over a long window for several requests in a row, so the
+    normal spread in processing time between images doesn't register.
+    """
+
+    def __init__(
+        self,
+        initial: int = DEFAULT_CONCURRENCY,
+        minimum: int = 1,
+        maximum: int = DEFAULT_CONCURRENCY,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+        window: int = 200,
+        min_samples: int = 20,
+        sustain: int = 5,
+    ):
+        """
+        Args:
+            initial (int, optional): Starting limit. Defaults to 4.
+            minimum (int, optional): Lowest limit. Defaults to 1.
+            maximum (int, optional): Highest limit. Defaults to 4.
+            backoff (float, optional): Factor applied to the limit on congestion. Defaults to 0.5.
+            latency_tolerance (float, optional): Short-term latency above this multiple of the baseline median counts as raised. Defaults to 2.0.
+            window (int, optional): Number of recent latencies the baseline median is taken from. Defaults to 200.
+            min_samples (int, optional): Latencies needed before latency is judged at all. Defaults to 20.
+            sustain (int, optional): Consecutive raised latencies that count as congestion. Defaults to 5.
+        """
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.min_samples = min_samples
+        self.sustain = sustain
+        self.in_flight = 0
+        self.requests = 0
+        self.decreases = 0
+        self._latencies = deque(maxlen=window)
+        self._smoothed: Optional[float] = None
+        self._raised = 0
+        self._epoch = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, deadline: Optional[Deadline] = None) -> _Ticket:
+        """
+        Wait for a free slot under the current limit.
+
+        Raises:
+            DeadlineExceeded: If the deadline runs out while waiting
+        """
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                remaining = deadline.remaining() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    raise DeadlineExceeded(
+                        "Deadline exceeded waiting for a request slot"
+                    )
+                self._condition.wait(remaining)
+            self.in_flight += 1
+            self.requests += 1
+            return _Ticket(self._epoch)
+
+    def release(self, ticket: _Ticket, latency: Optional[float] = None) -> None:
+        """
+        Free a slot and adjust the limit from the request's outcome.
+
+        Args:
+            ticket: The ticket returned by acquire()
+            latency (float, optional): Seconds the request took, None if it failed without a response
+        """
+        with self._condition:
+            self.in_flight -= 1
+            congested = ticket.congested or self._is_throttle(ticket.status)
+            if latency is not None and not congested:
+                congested = self._record_latency(latency)
+            if congested:
+                if ticket.epoch == self._epoch:
+                    self._epoch += 1
+                    self.decreases += 1
+                    self.limit = max(self.minimum, self.limit * self.backoff)
+            elif ticket.status is not None and ticket.status < 400:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def slot(self, deadline: Optional[Deadline] = None) -> Iterator[_Ticket]:
+        """
+        Hold a slot for one request, timing it and reading its outcome.
+
+        The block should raise for error statuses (raise_for_status); leaving it
+        normally counts as a success.
+        """
+        ticket = self.acquire(deadline)
+        start = time.monotonic()
+        latency = None
+        try:
+            yield ticket
+            latency = time.monotonic() - start
+            ticket.status = 200
+        except httpx.HTTPStatusError as exc:
+            ticket.status = exc.response.status_code
+            raise
+        except httpx.TimeoutException:
+            # Only network timeouts: the caller's own deadline running out
+            # (DeadlineExceeded) says nothing about the endpoint
+            ticket.congested = True
+            raise
+        finally:
+            self.release(ticket, latency)
+
+    def stats(self) -> Dict[str, float]:
+        """Return the current limit and usage counters."""
+        with self._condition:
+            return {
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "requests": self.requests,
+                "decreases": self.decreases,
+            }
+
+    @staticmethod
+    def _is_throttle(status: Optional[int]) -> bool:
+        return status is not None and (status == 429 or status >= 500)
+
+    def _record_latency(self, latency: float) -> bool:
+        self._latencies.append(latency)
+        if self._smoothed is None:
+            self._smoothed = latency
+        else:
+            self._smoothed = 0.9 * self._smoothed + 0.1 * latency
+        if len(self._latencies) < self.min_samples:
+            return False
+        baseline = statistics.median(self._latencies)
+        if self._smoothed > baseline * self.latency_tolerance:
+            self._raised += 1
+        else:
+            self._raised = 0
+        if self._raised < self.sustain:
+            return False
+        self._raised = 0
+        return True
+
+
+def endpoint_name(url: str) -> str:
+    """Return the short endpoint name of an API URL, such as "clarityUpscale"."""
+    return urlparse(url).path.rstrip("/").rsplit("/", 1)[-1]
+
+
+def configure_concurrency(initial: int, maximum: Optional[int] = None) -> None:
+    """
+    Set the starting and highest request concurrency per endpoint.
+
+    Applies to limiters created afterwards, so call it before making requests.
+
+    Args:
+        initial (int): Requests in flight per endpoint to start with
+        maximum (int, optional): Most requests in flight per endpoint. Defaults to `initial`.
+    """
+    global _initial_limit, _max_limit
+    with _limiters_lock:
+        _initial_limit = initial
+        _max_limit = max(initial, maximum or initial)
+
+
+def get_limiter(url: str) -> AdaptiveLimiter:
+    """Return the shared limiter for the endpoint of an API URL."""
+    name = endpoint_name(url)
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = _limiters[name] = AdaptiveLimiter(
+                initial=_initial_limit, maximum=_max_limit
+            )
+        return limiter
+
+
+def limiter_stats() -> Dict[str, Dict[str, float]]:
+    """Return the stats of every endpoint limiter in use, keyed by endpoint name."""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.stats() for name, limiter in limiters.items()}
@@ -0,0 +1,109 @@
+import importlib
+import io
+import os
+from typing import Iterable, Iterator, Optional
+
+import click
+
+from .workers import run_cpu
+
+# Vector results Pillow can't read; these are written as they are
+VECTOR_EXTENSIONS = (".svg",)
+
+# Output format name: (Pillow format, file extension)
+OUTPUT_FORMATS = {
+    "webp": ("WEBP", ".webp"),
+    "avif": ("AVIF", ".avif"),
+    "jpeg": ("JPEG", ".jpg"),
+}
+
+
+def _load_pillow(pillow_format: str):
+    try:
+        from PIL import Image
+    except ImportError as exc:
+        raise click.ClickException(
+            "Output conversion requires Pillow: pip install 'recraft-cli[convert]'"
+        ) from exc
+    Image.init()
+    if pillow_format == "AVIF" and pillow_format not in Image.SAVE:
+        try:
+            # Pillow releases before 11.3 only write AVIF through this plugin
+            importlib.import_module("pillow_avif")
+        except ImportError:
+            pass
+    if pillow_format not in Image.SAVE:
+        raise click.ClickException(
+            f"This Pillow installation can't write {pillow_format} images"
+        )
+    return Image
+
+
+def convert_image(data: bytes, pillow_format: str, quality: Optional[int]) -> bytes:
+    """
+    Re-encode an image held in memory.
+
+    Args:
+        data (bytes): Source image
+        pillow_format (str): Pillow format name to encode to, e.g. "WEBP"
+        quality (int, optional): Encoder quality, 1-100. Defaults to Pillow's own default.
+
+    Returns:
+        bytes: The re-encoded image
+    """
+    Image = _load_pillow(pillow_format)
+    with Image.open(io.BytesIO(data)) as image:
+        if pillow_format == "JPEG" and image.mode != "RGB":
+            # JPEG has no alpha channel: flatten transparency onto white
+            rgba = image.convert("RGBA")
+            image = Image.new("RGB", rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.getchannel("A"))
+        options = {} if quality is None else {"quality": quality}
+        output = io.BytesIO()
+        image.save(output, format=pillow_format, **options)
+    return output.getvalue()
+
+
+class ImageConverter:
+    """
+    Converts downloaded images to another format on their way to the sink.
+
+    The download is gathered in memory and re-encoded in the CPU worker pool,
+    so the original is never written to or read back from disk. Vector (SVG)
+    images can't be converted and are left alone. Requires the optional Pillow
+    dependency.
+    """
+
+    def __init__(self, output_format: str, quality: Optional[int] = None):
+        """
+        Args:
+            output_format (str): One of "webp", "avif" or "jpeg"
+            quality (int, optional): Encoder quality, 1-100. Defaults to the format's default.
+        """
+        self.pillow_format, self.extension = OUTPUT_FORMATS[output_format]
+        self.quality = quality
+        # Fail before any API credits are spent
+        _load_pillow(self.pillow_format)
+
+    def applies_to(self, filename: str) -> bool:
+        """Return whether an image with this filename can be converted."""
+        return os.path.splitext(filename)[1].lower() not in VECTOR_EXTENSIONS
+
+    def rename(self, filename: str) -> str:
+        """Return the filename with the extension of the output format."""
+        return os.path.splitext(filename)[0] + self.extension
+
+    def convert(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        Convert a stream of image chunks.
+
+        Args:
+            chunks (Iterable[bytes]): The source image
+
+        Yields:
+            bytes: The converted image
+        """
+        data = b"".join(chunks)
+        yield run_cpu(
+            convert_image, data, self.pillow_format, self.quality, size=len(data)
+        )
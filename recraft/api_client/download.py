@@ -1,3 +1,6 @@
+import base64
+import contextlib
+import hashlib
 import mimetypes
 import os
 from typing import Optional
@@ -7,91 +10,272 @@ import click
 import httpx
 from tqdm import tqdm
 
+from .client import get_client
+from .convert import ImageConverter
+from .hedge import HedgePolicy, hedged_send
+from .progress import active_progress, echo_status
+from .sinks import LocalDirSink, OutputSink
+from .timeouts import (
+    DEFAULT_TIMEOUT,
+    Deadline,
+    DeadlineExceeded,
+    TimeoutTypes,
+    clamp_timeout,
+    enforce_deadline,
+)
+
+
+def url_filename(image_url: str) -> str:
+    """
+    Derive a stable filename for an image URL.
+
+    Uses the URL's own filename when it has an extension, otherwise a name made
+    from a SHA-256 of the URL, so reruns always map a URL to the same file.
+
+    Args:
+        image_url (str): URL of the image
+
+    Returns:
+        str: Filename for the image
+    """
+    # Extract filename from URL or generate a content-addressed name
+    parsed_url = urlparse(image_url)
+    filename = os.path.basename(parsed_url.path)
+    if filename and os.path.splitext(filename)[1]:
+        return filename
+
+    # Try to guess mime type from URL, defaulting to .png if not an image
+    mime_type, _ = mimetypes.guess_type(image_url)
+    ext = ".png"
+    if mime_type and mime_type.startswith("image/"):
+        ext = mimetypes.guess_extension(mime_type) or ".png"
+    digest = hashlib.sha256(image_url.encode()).hexdigest()[:32]
+    return f"recraft_image_{digest}{ext}"
+
+
+def image_extension(data: bytes) -> str:
+    """Return the file extension for image bytes, judged by their signature."""
+    if data.startswith(b"\x89PNG"):
+        return ".png"
+    if data.startswith(b"\xff\xd8"):
+        return ".jpg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return ".webp"
+    if data.lstrip()[:5] in (b"<svg ", b"<?xml"):
+        return ".svg"
+    return ".png"
+
+
+def save_base64_image(
+    b64_data: str,
+    output_dir: Optional[str] = None,
+    custom_filename: Optional[str] = None,
+    sink: Optional[OutputSink] = None,
+    skip_existing: bool = False,
+    converter: Optional[ImageConverter] = None,
+) -> Optional[str]:
+    """
+    Decode an inline base64 image straight into an output sink.
+
+    Images without a custom filename get a stable name from a SHA-256 of their
+    content, so reruns map the same image to the same file.
+
+    Args:
+        b64_data (str): Base64 encoded image
+        output_dir (str, optional): Directory to save the image. Defaults to current directory.
+        custom_filename (str, optional): Custom filename for the image.
+        sink (OutputSink, optional): Destination for the image. Overrides output_dir.
+        skip_existing (bool, optional): Skip writing if the sink already has the file.
+        converter (ImageConverter, optional): Convert the image to another format before it is written.
+
+    Returns:
+        Optional[str]: Location of the saved image, or None if saving fails
+    """
+    if sink is None:
+        sink = LocalDirSink(output_dir)
+    err = sink.uses_stdout
+    quiet = active_progress() is not None
+
+    try:
+        # Decoding is fast enough inline; a worker process would cost more
+        data = base64.b64decode(b64_data)
+        filename = custom_filename
+        if not filename:
+            digest = hashlib.sha256(data).hexdigest()[:32]
+            filename = f"recraft_image_{digest}{image_extension(data)}"
+        if converter is not None and not converter.applies_to(filename):
+            converter = None
+        if converter is not None:
+            filename = converter.rename(filename)
+
+        if skip_existing and sink.exists(filename):
+            if not quiet:
+                click.echo(
+                    click.style(
+                        f"⏭️  Already saved: {sink.location(filename)}", fg="yellow"
+                    ),
+                    err=err,
+                )
+            return sink.location(filename)
+
+        chunks = [data]
+        if converter is not None:
+            chunks = converter.convert(chunks)
+        output_path = sink.write_stream(filename, chunks)
+
+        if not quiet:
+            click.echo(
+                click.style(
+                    f"✅ Image saved successfully: {output_path}", fg="bright_green"
+                ),
+                err=err,
+            )
+        return output_path
+
+    except Exception as exc:
+        echo_status(
+            click.style(f"\n❌ Error saving image: {exc}", fg="bright_red"),
+            err=err,
+        )
+        return None
+
 
 def download_image(
     image_url: str,
     output_dir: Optional[str] = None,
     custom_filename: Optional[str] = None,
+    sink: Optional[OutputSink] = None,
+    hedge: Optional[HedgePolicy] = None,
+    timeout: TimeoutTypes = DEFAULT_TIMEOUT,
+    deadline: Optional[Deadline] = None,
+    skip_existing: bool = False,
+    converter: Optional[ImageConverter] = None,
 ) -> Optional[str]:
     """
     Download an image from a given URL with a progress bar.
 
+    The response is streamed straight into the output sink, without a temporary file.
+
     Args:
         image_url (str): URL of the image to download
         output_dir (str, optional): Directory to save the image. Defaults to current directory.
         custom_filename (str, optional): Custom filename for the downloaded image.
+        sink (OutputSink, optional): Destination for the image. Overrides output_dir.
+        hedge (HedgePolicy, optional): Send a second request if first bytes are slow.
+        timeout (TimeoutTypes, optional): Timeout for the download, in seconds or per phase. Defaults to 60 seconds.
+        deadline (Deadline, optional): End-to-end deadline, also checked between chunks.
+        skip_existing (bool, optional): Skip the download if the sink already has the file.
+        converter (ImageConverter, optional): Convert the image to another format before it is written.
 
     Returns:
-        Optional[str]: Path to the downloaded image file, or None if download fails
+        Optional[str]: Location of the downloaded image, or None if download fails
+
+    Raises:
+        DeadlineExceeded: If the deadline runs out
     """
-    if not output_dir:
-        output_dir = os.getcwd()
+    if sink is None:
+        sink = LocalDirSink(output_dir)
+    # Keep stdout clean when it carries the image itself
+    err = sink.uses_stdout
+    # A batch dashboard replaces the per-download bar and chatter
+    dashboard = active_progress()
+    quiet = dashboard is not None
 
     try:
-        # Create output directory if it doesn't exist
-        os.makedirs(output_dir, exist_ok=True)
-
-        # Determine filename
-        if custom_filename:
-            filename = custom_filename
-        else:
-            # Extract filename from URL or generate a unique name
-            parsed_url = urlparse(image_url)
-            filename = os.path.basename(parsed_url.path)
-
-            # If no filename or no extension, use a default
-            if not filename or not os.path.splitext(filename)[1]:
-                # Try to guess mime type from URL
-                mime_type, _ = mimetypes.guess_type(image_url)
-
-                # Default to .png if no mime type or not an image
-                if not mime_type or not mime_type.startswith("image/"):
-                    filename = f"recraft_image_{hash(image_url)}.png"
-                else:
-                    # Use mime type extension if available
-                    ext = mimetypes.guess_extension(mime_type) or ".png"
-                    filename = f"recraft_image_{hash(image_url)}{ext}"
-
-        output_path = os.path.join(output_dir, filename)
+        filename = custom_filename or url_filename(image_url)
+        if converter is not None and not converter.applies_to(filename):
+            converter = None
+        if converter is not None:
+            filename = converter.rename(filename)
+
+        if skip_existing and sink.exists(filename):
+            if not quiet:
+                click.echo(
+                    click.style(
+                        f"⏭️  Already downloaded: {sink.location(filename)}",
+                        fg="yellow",
+                    ),
+                    err=err,
+                )
+            return sink.location(filename)
 
         # Notify about the image URL before downloading
-        click.echo(
-            click.style(f"📥 Downloading image from: {image_url}", fg="bright_blue")
-        )
+        if not quiet:
+            click.echo(
+                click.style(
+                    f"📥 Downloading image from: {image_url}", fg="bright_blue"
+                ),
+                err=err,
+            )
 
         # Download the image with progress bar
-        with httpx.stream("GET", image_url) as response:
-            total = int(response.headers.get("Content-Length", 0))
-
-            with tqdm(
-                total=total,
-                unit_scale=True,
-                unit_divisor=1024,
-                unit="B",
-                desc=click.style("Downloading", fg="bright_cyan"),
-                bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]",
-            ) as progress:
-                with open(output_path, "wb") as download_file:
-                    num_bytes_downloaded = 0
-                    for chunk in response.iter_bytes():
-                        download_file.write(chunk)
-                        progress.update(len(chunk))
-                        num_bytes_downloaded += len(chunk)
-
-        click.echo(
-            click.style(
-                f"✅ Image downloaded successfully: {output_path}", fg="bright_green"
+        with enforce_deadline(deadline):
+            client = get_client()
+            request = client.build_request(
+                "GET", image_url, timeout=clamp_timeout(timeout, deadline)
+            )
+            response = hedged_send(client, request, hedge)
+            # Streaming responses aren't context managers, so close explicitly
+            with contextlib.closing(response):
+                response.raise_for_status()
+                total = int(response.headers.get("Content-Length", 0))
+
+                with tqdm(
+                    total=total,
+                    unit_scale=True,
+                    unit_divisor=1024,
+                    unit="B",
+                    desc=click.style("Downloading", fg="bright_cyan"),
+                    bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]",
+                    disable=quiet,
+                ) as progress:
+
+                    def tracked_chunks():
+                        for chunk in response.iter_bytes():
+                            if deadline is not None:
+                                deadline.check()
+                            progress.update(len(chunk))
+                            if dashboard is not None:
+                                dashboard.add_bytes(len(chunk))
+                            yield chunk
+
+                    chunks = tracked_chunks()
+                    if converter is not None:
+                        chunks = converter.convert(chunks)
+                    output_path = sink.write_stream(filename, chunks)
+
+        if not quiet:
+            click.echo(
+                click.style(
+                    f"✅ Image downloaded successfully: {output_path}",
+                    fg="bright_green",
+                ),
+                err=err,
             )
-        )
         return output_path
 
+    except DeadlineExceeded:
+        raise
+    except httpx.HTTPStatusError as exc:
+        echo_status(
+            click.style(
+                f"\n❌ Error downloading image: {exc.response.status_code}",
+                fg="bright_red",
+            ),
+            err=err,
+        )
+        return None
     except httpx.RequestError as exc:
-        click.echo(click.style(f"\n❌ Error downloading image: {exc}", fg="bright_red"))
+        echo_status(
+            click.style(f"\n❌ Error downloading image: {exc}", fg="bright_red"),
+            err=err,
+        )
         return None
     except Exception as exc:
-        click.echo(
+        echo_status(
             click.style(
                 f"\n❌ Unexpected error downloading image: {exc}", fg="bright_red"
-            )
+            ),
+            err=err,
         )
         return None
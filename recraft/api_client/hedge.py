@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Optional
+
+import httpx
+
+
+class HedgePolicy:
+    """
+    Decides when a slow download gets a second, hedged request.
+
+    The policy tracks time-to-first-byte of recent downloads. Once a request has
+    waited longer than the configured percentile of those latencies, a duplicate
+    request is fired and whichever responds first is kept. Share one policy
+    across a batch: the hedge cap and metrics are per policy.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        max_hedges: int = 5,
+        initial_delay: float = 2.0,
+        min_delay: float = 0.1,
+        min_samples: int = 5,
+        window: int = 200,
+    ):
+        """
+        Args:
+            percentile (float, optional): Latency percentile after which to hedge. Defaults to 95.
+            max_hedges (int, optional): Maximum hedged requests for this policy. Defaults to 5.
+            initial_delay (float, optional): Hedge delay in seconds until enough samples exist. Defaults to 2.
+            min_delay (float, optional): Lower bound for the hedge delay in seconds. Defaults to 0.1.
+            min_samples (int, optional): Samples needed before using the percentile. Defaults to 5.
+            window (int, optional): Number of recent latencies kept. Defaults to 200.
+        """
+        if not 0 < percentile <= 100:
+            raise ValueError("percentile must be between 0 and 100")
+        self.percentile = percentile
+        self.max_hedges = max_hedges
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.requests = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+
+    def record(self, latency: float) -> None:
+        """Record the time-to-first-byte of a completed request."""
+        with self._lock:
+            self._latencies.append(latency)
+
+    def delay(self) -> float:
+        """Return how long to wait for first bytes before hedging, in seconds."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return self.initial_delay
+            ordered = sorted(self._latencies)
+        # Nearest-rank percentile
+        rank = round(self.percentile / 100 * len(ordered)) - 1
+        rank = max(0, min(len(ordered) - 1, rank))
+        return max(self.min_delay, ordered[rank])
+
+    def record_request(self) -> None:
+        """Count a request sent under this policy."""
+        with self._lock:
+            self.requests += 1
+
+    def record_win(self) -> None:
+        """Count a hedge that responded before the original request."""
+        with self._lock:
+            self.hedges_won += 1
+
+    def try_acquire(self) -> bool:
+        """Reserve one hedge from the cap, returning False once it is spent."""
+        with self._lock:
+            if self.hedges_fired >= self.max_hedges:
+                return False
+            self.hedges_fired += 1
+            return True
+
+    def metrics(self) -> dict:
+        """Return request and hedge counters."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedges_fired": self.hedges_fired,
+                "hedges_won": self.hedges_won,
+            }
+
+
+def _close_when_done(future: Future) -> None:
+    if future.cancelled() or future.exception() is not None:
+        return
+    future.result().close()
+
+
+def hedged_send(
+    client: httpx.Client,
+    request: httpx.Request,
+    policy: Optional[HedgePolicy] = None,
+) -> httpx.Response:
+    """
+    Send an idempotent request, hedging it if first bytes are slow to arrive.
+
+    The returned response is streaming and must be closed by the caller; the
+    losing response, if any, is closed automatically.
+
+    Args:
+        client (httpx.Client): Client to send the request with
+        request (httpx.Request): An idempotent request (e.g. a result download)
+        policy (HedgePolicy, optional): Hedging policy. Without one the request is sent once.
+
+    Returns:
+        httpx.Response: The first response to arrive
+    """
+    if policy is None:
+        return client.send(request, stream=True)
+
+    policy.record_request()
+
+    executor = ThreadPoolExecutor(max_workers=2)
+    try:
+        # Time each request from its own send, so a winning hedge excludes the delay
+        started = {}
+        primary = executor.submit(client.send, request, stream=True)
+        started[primary] = time.monotonic()
+        pending = {primary}
+        done, pending = wait(pending, timeout=policy.delay())
+        if not done and policy.try_acquire():
+            hedge = executor.submit(client.send, request, stream=True)
+            started[hedge] = time.monotonic()
+            pending.add(hedge)
+
+        error: Optional[BaseException] = None
+        while True:
+            for future in done:
+                if future.exception() is None:
+                    policy.record(time.monotonic() - started[future])
+                    if future is not primary:
+                        policy.record_win()
+                    # Drop the loser as soon as it answers
+                    for other in (done | pending) - {future}:
+                        other.add_done_callback(_close_when_done)
+                    return future.result()
+                error = future.exception()
+            if not pending:
+                raise error
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+    finally:
+        executor.shutdown(wait=False)
@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+import click
+from tqdm import tqdm
+
+# The dashboard currently drawing, if any; per-request bars stay quiet while set
+_active: Optional["BatchProgress"] = None
+
+
+def active_progress() -> Optional["BatchProgress"]:
+    """Return the batch dashboard currently shown, if any."""
+    return _active
+
+
+def echo_status(message: str, err: bool = False) -> None:
+    """Print a status line without garbling the batch dashboard, if one is shown."""
+    if _active is not None:
+        _active.write(message)
+    else:
+        click.echo(message, err=err)
+
+
+def _percentile(ordered, percentile: float) -> float:
+    rank = max(0, min(len(ordered) - 1, round(percentile / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class BatchProgress:
+    """
+    One aggregate progress display for a batch of jobs.
+
+    Shows jobs done, failed and in flight, request and download throughput,
+    p50/p95 request latency and the ETA. Counters are cheap to update from any
+    thread; the display itself is redrawn by a background thread at a fixed,
+    low rate so rendering never competes with the jobs.
+    """
+
+    def __init__(self, total: int, interval: float = 0.5, window: int = 500):
+        """
+        Args:
+            total (int): Number of jobs in the batch
+            interval (float, optional): Seconds between redraws. Defaults to 0.5.
+            window (int, optional): Number of recent latencies kept. Defaults to 500.
+        """
+        self.total = total
+        self.interval = interval
+        self.done = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.requests = 0
+        self.bytes = 0
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._bar: Optional[tqdm] = None
+        self._start = time.monotonic()
+
+    def __enter__(self) -> "BatchProgress":
+        global _active
+        self._start = time.monotonic()
+        self._bar = tqdm(
+            total=self.total,
+            desc="Batch",
+            unit="job",
+            # Only our own thread redraws the bar
+            mininterval=float("inf"),
+            bar_format=(
+                "{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}] {postfix}"
+            ),
+        )
+        _active = self
+        self._thread = threading.Thread(
+            target=self._render_loop, name="recraft-progress", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        global _active
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._render()
+        _active = None
+        self._bar.close()
+
+    def job_started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def job_finished(self, ok: bool) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if ok:
+                self.done += 1
+            else:
+                self.failed += 1
+
+    def job_requeued(self) -> None:
+        """Count a job that was cut off and will run again."""
+        with self._lock:
+            self.in_flight -= 1
+
+    def record_request(self, latency: float) -> None:
+        """Record a completed API request and how long it took."""
+        with self._lock:
+            self.requests += 1
+            self._latencies.append(latency)
+
+    def add_bytes(self, count: int) -> None:
+        """Count downloaded bytes."""
+        with self._lock:
+            self.bytes += count
+
+    def write(self, message: str) -> None:
+        """Print a line above the dashboard."""
+        tqdm.write(message)
+
+    def summary(self) -> str:
+        """Return the current statistics as one line."""
+        with self._lock:
+            elapsed = max(time.monotonic() - self._start, 1e-9)
+            parts = [
+                f"ok={self.done}",
+                f"failed={self.failed}",
+                f"active={self.in_flight}",
+                f"{self.requests / elapsed:.2f} req/s",
+                f"{self.bytes / elapsed / 1_000_000:.2f} MB/s",
+            ]
+            if self._latencies:
+                ordered = sorted(self._latencies)
+                parts.append(f"p50={_percentile(ordered, 50):.1f}s")
+                parts.append(f"p95={_percentile(ordered, 95):.1f}s")
+        return " ".join(parts)
+
+    def _render(self) -> None:
+        self._bar.n = self.done + self.failed
+        self._bar.set_postfix_str(self.summary(), refresh=False)
+        self._bar.refresh()
+
+    def _render_loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._render()
@@ -1,18 +1,26 @@
 from typing import Any, Dict, Optional, Union
 
-from .base import process_image
+from .base import ImageSource, process_image
+from .timeouts import DEFAULT_TIMEOUT, Deadline, TimeoutTypes
+from .token_pool import TokenPool
 
 
 def remove_background(
-    file_path: str, response_format: Optional[str] = None, timeout: int = 30
+    file_path: ImageSource,
+    response_format: Optional[str] = None,
+    timeout: TimeoutTypes = DEFAULT_TIMEOUT,
+    deadline: Optional[Deadline] = None,
+    token_pool: Optional[TokenPool] = None,
 ) -> Optional[Union[str, Dict[str, Any]]]:
     """
     Removes background of a given raster image.
 
     Args:
-        file_path (str): Path to the PNG image to remove background from
+        file_path (ImageSource): Path to the PNG image to remove background from, or a binary stream
         response_format (str, optional): Format of the response. Defaults to None (url).
-        timeout (int, optional): Timeout for the API request. Defaults to 30 seconds.
+        timeout (TimeoutTypes, optional): Timeout for the API request, in seconds or per phase. Defaults to 60 seconds.
+        deadline (Deadline, optional): End-to-end deadline for the request.
+        token_pool (TokenPool, optional): Tokens to spread requests over. Defaults to the stored token.
 
     Returns:
         Optional[Union[str, Dict[str, Any]]]: Background-removed image URL or base64 JSON, or None if removal fails
@@ -23,4 +31,6 @@ def remove_background(
         operation_name="Removing Background",
         response_format=response_format,
         timeout=timeout,
+        deadline=deadline,
+        token_pool=token_pool,
     )
@@ -0,0 +1,267 @@
+import contextlib
+import hashlib
+import os
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Iterable, Optional
+from urllib.parse import urlparse
+
+import click
+
+# S3 requires every multipart part but the last to be at least 5 MiB
+S3_PART_SIZE = 8 * 1024 * 1024
+
+
+def _file_sha256(path: str) -> str:
+    with open(path, "rb") as stored:
+        return hashlib.file_digest(stored, "sha256").hexdigest()
+
+
+class OutputSink(ABC):
+    """
+    Destination for downloaded images.
+
+    Sinks consume an iterable of byte chunks so results can be streamed straight
+    from the HTTP response without staging them on disk.
+    """
+
+    #: Whether the sink writes to stdout, so status messages must go to stderr
+    uses_stdout = False
+
+    @abstractmethod
+    def write_stream(self, filename: str, chunks: Iterable[bytes]) -> str:
+        """
+        Write a stream of chunks under the given filename.
+
+        Args:
+            filename (str): Name of the output object
+            chunks (Iterable[bytes]): Image content
+
+        Returns:
+            str: Location the image was written to
+        """
+
+    @abstractmethod
+    def location(self, filename: str) -> str:
+        """Return where an image with the given filename is (or would be) stored."""
+
+    def exists(self, filename: str) -> bool:
+        """
+        Return whether a complete image is already stored under the filename.
+
+        Sinks only ever publish fully written images, so an existing one can
+        be trusted and skipped.
+        """
+        return False
+
+
+class LocalDirSink(OutputSink):
+    """
+    Write images into a local directory.
+
+    Images are written to a temporary file and renamed into place, so a file
+    under its final name is always complete. With `dedupe`, identical images
+    are hardlinked to one copy kept in a content-addressed `.recraft-objects`
+    directory.
+    """
+
+    OBJECTS_DIR = ".recraft-objects"
+
+    def __init__(self, output_dir: Optional[str] = None, dedupe: bool = False):
+        self.output_dir = os.path.abspath(output_dir or os.getcwd())
+        self.dedupe = dedupe
+
+    def location(self, filename: str) -> str:
+        return os.path.join(self.output_dir, filename)
+
+    def exists(self, filename: str) -> bool:
+        return os.path.isfile(self.location(filename))
+
+    def write_stream(self, filename: str, chunks: Iterable[bytes]) -> str:
+        output_path = self.location(filename)
+        # Filenames may name a subdirectory, e.g. for bookkeeping markers
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        tmp_path = f"{output_path}.{uuid.uuid4().hex}.part"
+        # Only dedupe needs the checksum; hashlib drops the GIL on large chunks
+        digest = hashlib.sha256() if self.dedupe else None
+        try:
+            with open(tmp_path, "wb") as output_file:
+                for chunk in chunks:
+                    output_file.write(chunk)
+                    if digest is not None:
+                        digest.update(chunk)
+            if self.dedupe:
+                self._publish_deduplicated(tmp_path, output_path, digest.hexdigest())
+            else:
+                os.replace(tmp_path, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        return output_path
+
+    def _publish_deduplicated(
+        self, tmp_path: str, output_path: str, digest: str
+    ) -> None:
+        objects_dir = os.path.join(self.output_dir, self.OBJECTS_DIR)
+        object_path = os.path.join(objects_dir, digest)
+        try:
+            if os.path.exists(object_path):
+                if _file_sha256(object_path) == digest:
+                    # Same content already stored: link to it and drop the new copy
+                    link_path = f"{tmp_path}.link"
+                    os.link(object_path, link_path)
+                    os.replace(link_path, output_path)
+                    return
+                # Changed since it was stored, e.g. edited through one of its links;
+                # files already linked to it keep their copy
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(object_path)
+            os.replace(tmp_path, output_path)
+            os.makedirs(objects_dir, exist_ok=True)
+            os.link(output_path, object_path)
+        except FileExistsError:
+            # Another job stored the same content first, keep our own copy
+            pass
+        except OSError:
+            # Hardlinks unsupported here, fall back to a plain file
+            if os.path.exists(tmp_path):
+                os.replace(tmp_path, output_path)
+
+
+class StdoutSink(OutputSink):
+    """Write raw image bytes to stdout."""
+
+    uses_stdout = True
+
+    def location(self, filename: str) -> str:
+        return "<stdout>"
+
+    def write_stream(self, filename: str, chunks: Iterable[bytes]) -> str:
+        stdout = click.get_binary_stream("stdout")
+        for chunk in chunks:
+            stdout.write(chunk)
+        stdout.flush()
+        return "<stdout>"
+
+
+class S3Sink(OutputSink):
+    """
+    Write images to an S3-compatible bucket using multipart uploads.
+
+    Requires the optional `boto3` dependency. Credentials and region come from
+    the usual AWS environment; set `endpoint_url` (or `AWS_ENDPOINT_URL`) to
+    target a MinIO or other S3-compatible server.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        part_size: int = S3_PART_SIZE,
+        client: Any = None,
+    ):
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.part_size = part_size
+        if client is None:
+            try:
+                import boto3
+            except ImportError as exc:
+                raise click.ClickException(
+                    "S3 output requires boto3: pip install 'recraft-cli[s3]'"
+                ) from exc
+            client = boto3.client(
+                "s3", endpoint_url=endpoint_url or os.environ.get("AWS_ENDPOINT_URL")
+            )
+        self.client = client
+
+    def key_for(self, filename: str) -> str:
+        return f"{self.prefix}/{filename}" if self.prefix else filename
+
+    def location(self, filename: str) -> str:
+        return f"s3://{self.bucket}/{self.key_for(filename)}"
+
+    def exists(self, filename: str) -> bool:
+        # Objects only become visible once an upload completes
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.key_for(filename))
+        except self.client.exceptions.ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                return False
+            raise
+        return True
+
+    def write_stream(self, filename: str, chunks: Iterable[bytes]) -> str:
+        key = self.key_for(filename)
+        buffer = bytearray()
+        upload_id = None
+        parts = []
+
+        try:
+            for chunk in chunks:
+                buffer.extend(chunk)
+                if len(buffer) < self.part_size:
+                    continue
+                # Only start a multipart upload once there is more than one part
+                if upload_id is None:
+                    upload_id = self.client.create_multipart_upload(
+                        Bucket=self.bucket, Key=key
+                    )["UploadId"]
+                parts.append(self._upload_part(key, upload_id, len(parts) + 1, buffer))
+                buffer = bytearray()
+
+            if upload_id is None:
+                self.client.put_object(Bucket=self.bucket, Key=key, Body=bytes(buffer))
+            else:
+                if buffer:
+                    parts.append(
+                        self._upload_part(key, upload_id, len(parts) + 1, buffer)
+                    )
+                self.client.complete_multipart_upload(
+                    Bucket=self.bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    MultipartUpload={"Parts": parts},
+                )
+        except BaseException:
+            if upload_id is not None:
+                self.client.abort_multipart_upload(
+                    Bucket=self.bucket, Key=key, UploadId=upload_id
+                )
+            raise
+
+        return self.location(filename)
+
+    def _upload_part(
+        self, key: str, upload_id: str, part_number: int, data: bytearray
+    ) -> dict:
+        response = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=bytes(data),
+        )
+        return {"ETag": response["ETag"], "PartNumber": part_number}
+
+
+def sink_from_uri(uri: Optional[str], dedupe: bool = False) -> OutputSink:
+    """
+    Build an output sink from a CLI destination.
+
+    Args:
+        uri (str, optional): "s3://bucket/prefix" for object storage, otherwise
+            a local directory. Defaults to the current directory.
+        dedupe (bool, optional): Hardlink identical local images. Defaults to False.
+
+    Returns:
+        OutputSink: The matching sink
+    """
+    if uri and uri.startswith("s3://"):
+        parsed = urlparse(uri)
+        if not parsed.netloc:
+            raise click.BadParameter(f"Missing bucket name in '{uri}'")
+        return S3Sink(parsed.netloc, parsed.path)
+    return LocalDirSink(uri, dedupe=dedupe)
+
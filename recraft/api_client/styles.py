@@ -0,0 +1,351 @@
+import bisect
+import difflib
+import json
+import os
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import click
+import httpx
+
+STYLES_CATALOGUE_URL = os.environ.get(
+    "RECRAFT_STYLES_URL", "https://external.api.recraft.ai/v1/styles"
+)
+
+# Styles bundled with the CLI, always valid even without a refreshed catalogue
+BUILTIN_STYLES: Tuple[str, ...] = (
+    # Realistic Image Styles
+    "any",
+    "realistic_image",
+    "realistic_image_mockup",
+    "realistic_image_b_and_w",
+    "realistic_image_enterprise",
+    "realistic_image_hard_flash",
+    "realistic_image_hdr",
+    "realistic_image_natural_light",
+    "realistic_image_studio_portrait",
+    "realistic_image_motion_blur",
+    "realistic_image_evening_light",
+    "realistic_image_faded_nostalgia",
+    "realistic_image_forest_life",
+    "realistic_image_golden_hues",
+    "realistic_image_intensity_hue",
+    "realistic_image_mystic_naturalism",
+    "realistic_image_natural_tones",
+    "realistic_image_nightlife_shine",
+    "realistic_image_organic_calm",
+    "realistic_image_real_life_glow",
+    "realistic_image_retro_realism",
+    "realistic_image_retro_snapshot",
+    "realistic_image_serene_fogscape",
+    "realistic_image_urban_drama",
+    "realistic_image_village_realism",
+    "realistic_image_warm_folk",
+    # Digital Illustration Styles
+    "digital_illustration",
+    "illustration_3d",
+    "digital_illustration_seamless",
+    "digital_illustration_pixel_art",
+    "digital_illustration_3d",
+    "digital_illustration_psychedelic",
+    "digital_illustration_hand_drawn",
+    "digital_illustration_grain",
+    "digital_illustration_glow",
+    "digital_illustration_80s",
+    "digital_illustration_watercolor",
+    "digital_illustration_voxel",
+    "digital_illustration_infantile_sketch",
+    "digital_illustration_2d_art_poster",
+    "digital_illustration_kawaii",
+    "digital_illustration_halloween_drawings",
+    "digital_illustration_2d_art_poster_2",
+    "digital_illustration_engraving_color",
+    "digital_illustration_flat_air_art",
+    "digital_illustration_hand_drawn_outline",
+    "digital_illustration_handmade_3d",
+    "digital_illustration_stickers_drawings",
+    "digital_illustration_antiquarian",
+    "digital_illustration_bold_fantasy",
+    "digital_illustration_child_book",
+    "digital_illustration_child_books",
+    "digital_illustration_cover",
+    "digital_illustration_crosshatch",
+    "digital_illustration_digital_engraving",
+    "digital_illustration_dreamlike_hues",
+    "digital_illustration_expressionism",
+    "digital_illustration_freehand_details",
+    "digital_illustration_grain_20",
+    "digital_illustration_graphic_intensity",
+    "digital_illustration_hard_comics",
+    "digital_illustration_long_shadow",
+    "digital_illustration_modern_folk",
+    "digital_illustration_multicolor",
+    "digital_illustration_neon_calm",
+    "digital_illustration_noir",
+    "digital_illustration_nostalgic_pastel",
+    "digital_illustration_outline_details",
+    "digital_illustration_pastel_gradient",
+    "digital_illustration_pastel_sketch",
+    "digital_illustration_pop_art",
+    "digital_illustration_pop_renaissance",
+    "digital_illustration_quiet_curiosity",
+    "digital_illustration_sketch_and_shade",
+    "digital_illustration_street_art",
+    "digital_illustration_tablet_sketch",
+    "digital_illustration_urban_glow",
+    "digital_illustration_urban_sketching",
+    "digital_illustration_vanilla_dreams",
+    "digital_illustration_young_adult_book",
+    "digital_illustration_young_adult_book_2",
+    # Vector Illustration Styles
+    "vector_illustration",
+    "vector_illustration_seamless",
+    "vector_illustration_line_art",
+    "vector_illustration_doodle_line_art",
+    "vector_illustration_flat_2",
+    "vector_illustration_70s",
+    "vector_illustration_cartoon",
+    "vector_illustration_kawaii",
+    "vector_illustration_linocut",
+    "vector_illustration_engraving",
+    "vector_illustration_halloween_stickers",
+    "vector_illustration_line_circuit",
+    "vector_illustration_bold_stroke",
+    "vector_illustration_chemistry",
+    "vector_illustration_colored_stencil",
+    "vector_illustration_contour_pop_art",
+    "vector_illustration_cosmics",
+    "vector_illustration_cutout",
+    "vector_illustration_depressive",
+    "vector_illustration_editorial",
+    "vector_illustration_emotional_flat",
+    "vector_illustration_infographical",
+    "vector_illustration_marker_outline",
+    "vector_illustration_mosaic",
+    "vector_illustration_naivector",
+    "vector_illustration_ornamenticute",
+    "vector_illustration_roundish_flat",
+    "vector_illustration_segmented_colors",
+    "vector_illustration_sharp_contrast",
+    "vector_illustration_thin",
+    "vector_illustration_vector_photo",
+    "vector_illustration_vivid_shapes",
+)
+
+# Style categories as (prefix, display name), in the order they are offered
+STYLE_CATEGORIES: Tuple[Tuple[str, str], ...] = (
+    ("any", "Any Style (Random)"),
+    ("realistic_image", "Realistic Image"),
+    ("digital_illustration", "Digital Illustration"),
+    ("vector_illustration", "Vector Illustration"),
+)
+
+
+class StyleRegistry:
+    """
+    Indexed collection of style names and the account's custom styles.
+
+    Membership checks are O(1) set lookups, prefix lookups bisect a sorted
+    index of (name, catalogue position) pairs, and category listings are built
+    once on construction. Custom styles are known by their ID and map to the
+    base style they were created from.
+    """
+
+    def __init__(
+        self, styles: Iterable[str], custom_styles: Optional[Dict[str, str]] = None
+    ):
+        # Preserve the catalogue order while dropping duplicates
+        self._styles: Tuple[str, ...] = tuple(dict.fromkeys(styles))
+        self._custom: Dict[str, str] = dict(custom_styles or {})
+        self._index = frozenset(self._styles) | frozenset(self._custom)
+        self._sorted: List[Tuple[str, int]] = sorted(
+            (style, position) for position, style in enumerate(self._styles)
+        )
+        self._sorted_names: List[str] = [style for style, _ in self._sorted]
+        self._categories: Dict[str, List[str]] = {
+            prefix: self.with_prefix(prefix) for prefix, _ in STYLE_CATEGORIES
+        }
+
+    def __contains__(self, style: object) -> bool:
+        return style in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._styles)
+
+    def __len__(self) -> int:
+        return len(self._styles) + len(self._custom)
+
+    @property
+    def custom_styles(self) -> Dict[str, str]:
+        """Custom style IDs mapped to their base styles."""
+        return dict(self._custom)
+
+    def is_custom(self, style: str) -> bool:
+        """Return whether `style` is the ID of a custom style."""
+        return style in self._custom
+
+    def base_style(self, style: str) -> str:
+        """Return the base style of a custom style ID, or the style itself."""
+        return self._custom.get(style, style)
+
+    def with_prefix(self, prefix: str) -> List[str]:
+        """
+        Return styles starting with the given prefix, in catalogue order.
+
+        Args:
+            prefix (str): Style name prefix, e.g. "vector_illustration"
+
+        Returns:
+            List[str]: Matching style names
+        """
+        start = bisect.bisect_left(self._sorted_names, prefix)
+        end = start
+        while end < len(self._sorted_names) and self._sorted_names[end].startswith(
+            prefix
+        ):
+            end += 1
+        positions = sorted(position for _, position in self._sorted[start:end])
+        return [self._styles[position] for position in positions]
+
+    def category(self, prefix: str) -> List[str]:
+        """
+        Return the styles of a category from STYLE_CATEGORIES.
+
+        Args:
+            prefix (str): Category prefix
+
+        Returns:
+            List[str]: Styles in the category (empty for unknown categories)
+        """
+        return self._categories.get(prefix, [])
+
+    def suggest(self, style: str, limit: int = 3) -> List[str]:
+        """
+        Suggest known styles that closely resemble an unknown one.
+
+        Args:
+            style (str): The (probably misspelt) style name
+            limit (int, optional): Maximum number of suggestions. Defaults to 3.
+
+        Returns:
+            List[str]: Closest matching style names, best first
+        """
+        return difflib.get_close_matches(
+            style, self._sorted_names, n=limit, cutoff=0.6
+        )
+
+
+def cache_path() -> str:
+    """Return the path of the on-disk style catalogue cache."""
+    return os.path.join(click.get_app_dir("recraft-cli"), "styles.json")
+
+
+def _read_cache() -> Optional[Dict[str, Any]]:
+    try:
+        with open(cache_path(), encoding="utf-8") as cache_file:
+            cached = json.load(cache_file)
+        return {
+            "styles": [str(style) for style in cached["styles"]],
+            "custom_styles": {
+                str(style_id): str(base)
+                for style_id, base in cached.get("custom_styles", {}).items()
+            },
+        }
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def _write_cache(styles: List[str], custom_styles: Dict[str, str]) -> None:
+    path = cache_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as cache_file:
+        json.dump(
+            {
+                "fetched_at": time.time(),
+                "styles": styles,
+                "custom_styles": custom_styles,
+            },
+            cache_file,
+        )
+    os.replace(tmp_path, path)
+
+
+def fetch_styles(
+    api_token: str, timeout: int = 30
+) -> Tuple[List[str], Dict[str, str]]:
+    """
+    Fetch the style catalogue from the API.
+
+    The API lists the account's custom styles as objects with an "id" and the
+    base "style" they were made from. Plain names, or objects without an ID,
+    are taken as style names.
+
+    Args:
+        api_token (str): Authentication token
+        timeout (int, optional): Timeout for the API request. Defaults to 30 seconds.
+
+    Returns:
+        Tuple[List[str], Dict[str, str]]: Style names, and custom style IDs mapped to their base styles
+    """
+    response = httpx.get(
+        STYLES_CATALOGUE_URL,
+        headers={"Authorization": f"Bearer {api_token}"},
+        timeout=timeout,
+    )
+    response.raise_for_status()
+    payload = response.json()
+    entries = payload.get("styles", []) if isinstance(payload, dict) else payload
+    styles = []
+    custom_styles = {}
+    for entry in entries:
+        if isinstance(entry, dict):
+            name, style_id = entry.get("style"), entry.get("id")
+        else:
+            name, style_id = entry, None
+        if not isinstance(name, str) or not name:
+            continue
+        if isinstance(style_id, str) and style_id:
+            custom_styles[style_id] = name
+        else:
+            styles.append(name)
+    return styles, custom_styles
+
+
+def refresh_styles(api_token: str, timeout: int = 30) -> StyleRegistry:
+    """
+    Refresh the on-disk catalogue cache from the API and return the new registry.
+
+    Remote styles are merged with the built-in ones so a partial catalogue never
+    makes a bundled style invalid.
+
+    Args:
+        api_token (str): Authentication token
+        timeout (int, optional): Timeout for the API request. Defaults to 30 seconds.
+
+    Returns:
+        StyleRegistry: Registry built from the refreshed catalogue
+    """
+    styles, custom_styles = fetch_styles(api_token, timeout)
+    _write_cache(
+        [style for style in styles if style not in BUILTIN_STYLES], custom_styles
+    )
+    get_style_registry.cache_clear()
+    return get_style_registry()
+
+
+@lru_cache(maxsize=None)
+def get_style_registry() -> StyleRegistry:
+    """
+    Return the process-wide style registry.
+
+    Built from the built-in styles plus any cached remote catalogue. Validation
+    never triggers a network call; the cache only changes on
+    `recraft styles --refresh`.
+    """
+    cached = _read_cache() or {}
+    return StyleRegistry(
+        BUILTIN_STYLES + tuple(cached.get("styles", ())),
+        cached.get("custom_styles"),
+    )
@@ -0,0 +1,138 @@
+import contextlib
+import time
+from typing import Iterator, Optional, Union
+
+import httpx
+
+# Default per-phase timeout in seconds, shared by the library and the CLI
+DEFAULT_TIMEOUT = 60.0
+# Connecting should never take as long as processing an image
+DEFAULT_CONNECT_TIMEOUT = 10.0
+
+# A single number applies to every phase, httpx.Timeout sets them separately
+TimeoutTypes = Union[float, httpx.Timeout]
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a job or batch runs out of its time budget."""
+
+
+class Deadline:
+    """
+    An end-to-end time budget for a job or a batch.
+
+    A child deadline never outlives its parent, so a per-job deadline created
+    from a batch deadline stops at whichever expires first.
+    """
+
+    def __init__(self, seconds: Optional[float], parent: Optional["Deadline"] = None):
+        """
+        Args:
+            seconds (float, optional): Budget in seconds. None means unlimited.
+            parent (Deadline, optional): Enclosing deadline, e.g. the batch deadline.
+        """
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+        if parent is not None and parent.expires_at is not None:
+            if self.expires_at is None or parent.expires_at < self.expires_at:
+                self.expires_at = parent.expires_at
+
+    def child(self, seconds: Optional[float]) -> "Deadline":
+        """Return a deadline of `seconds` that also respects this one."""
+        return Deadline(seconds, parent=self)
+
+    def remaining(self) -> Optional[float]:
+        """Return the seconds left, or None when unlimited."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def check(self) -> None:
+        """Raise DeadlineExceeded if the budget has run out."""
+        if self.expired:
+            raise DeadlineExceeded("Deadline exceeded")
+
+
+def build_timeout(
+    timeout: Optional[TimeoutTypes] = None,
+    connect: Optional[float] = None,
+    read: Optional[float] = None,
+    write: Optional[float] = None,
+    pool: Optional[float] = None,
+) -> httpx.Timeout:
+    """
+    Build an httpx.Timeout with separate connect/read/write/pool phases.
+
+    Args:
+        timeout (TimeoutTypes, optional): Base timeout for every phase. Defaults to DEFAULT_TIMEOUT.
+        connect (float, optional): Connection timeout. Defaults to DEFAULT_CONNECT_TIMEOUT.
+        read (float, optional): Timeout between received chunks
+        write (float, optional): Timeout between sent chunks
+        pool (float, optional): Timeout waiting for a pooled connection
+
+    Returns:
+        httpx.Timeout: The combined timeout
+    """
+    if isinstance(timeout, httpx.Timeout):
+        base = timeout
+    else:
+        seconds = DEFAULT_TIMEOUT if timeout is None else timeout
+        base = httpx.Timeout(seconds, connect=min(DEFAULT_CONNECT_TIMEOUT, seconds))
+    return httpx.Timeout(
+        connect=base.connect if connect is None else connect,
+        read=base.read if read is None else read,
+        write=base.write if write is None else write,
+        pool=base.pool if pool is None else pool,
+    )
+
+
+def clamp_timeout(
+    timeout: Optional[TimeoutTypes], deadline: Optional[Deadline] = None
+) -> httpx.Timeout:
+    """
+    Limit every timeout phase to the time left on a deadline.
+
+    Args:
+        timeout (TimeoutTypes, optional): Requested timeout
+        deadline (Deadline, optional): Deadline the request must finish within
+
+    Returns:
+        httpx.Timeout: Timeout that cannot outlive the deadline
+    """
+    timeout = build_timeout(timeout)
+    remaining = deadline.remaining() if deadline is not None else None
+    if remaining is None:
+        return timeout
+
+    def clamp(value: Optional[float]) -> float:
+        return remaining if value is None else min(value, remaining)
+
+    return httpx.Timeout(
+        connect=clamp(timeout.connect),
+        read=clamp(timeout.read),
+        write=clamp(timeout.write),
+        pool=clamp(timeout.pool),
+    )
+
+
+@contextlib.contextmanager
+def enforce_deadline(deadline: Optional[Deadline]) -> Iterator[None]:
+    """
+    Check a deadline before a request and report timeouts it caused.
+
+    httpx timeouts raised after the deadline has run out are re-raised as
+    DeadlineExceeded so callers can tell a spent budget from a slow server.
+    """
+    if deadline is None:
+        yield
+        return
+    deadline.check()
+    try:
+        yield
+    except (httpx.TimeoutException, TimeoutError) as exc:
+        if isinstance(exc, DeadlineExceeded) or not deadline.expired:
+            raise
+        raise DeadlineExceeded("Deadline exceeded") from exc
@@ -0,0 +1,181 @@
+import threading
+import time
+from typing import Callable, Dict, Optional, TypeVar
+
+import httpx
+
+from .timeouts import Deadline, DeadlineExceeded
+
+T = TypeVar("T")
+
+# Statuses that mean the token itself is unusable
+AUTH_ERROR_STATUSES = (401, 403)
+MAX_BACKOFF = 60.0
+
+
+class TokenPoolExhausted(RuntimeError):
+    """Raised when every token in the pool has been drained."""
+
+
+class _TokenState:
+    def __init__(self, name: str, token: str):
+        self.name = name
+        self.token = token
+        self.in_flight = 0
+        self.requests = 0
+        self.throttled = 0
+        self.auth_errors = 0
+        self.consecutive_throttles = 0
+        self.backoff_until = 0.0
+        self.drained = False
+
+
+class TokenPool:
+    """
+    Spreads concurrent requests across several API tokens.
+
+    Each request goes to the usable token with the fewest requests in flight.
+    A 429 puts the token into back-off (honouring Retry-After, otherwise
+    exponential), and an auth error drains it from the pool for good.
+    """
+
+    def __init__(self, tokens: Dict[str, str]):
+        """
+        Args:
+            tokens (Dict[str, str]): API tokens keyed by profile name
+        """
+        if not tokens:
+            raise ValueError("A token pool needs at least one token")
+        self._states = [_TokenState(name, token) for name, token in tokens.items()]
+        self._condition = threading.Condition()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def acquire(self, deadline: Optional[Deadline] = None) -> _TokenState:
+        """
+        Reserve the least busy usable token, waiting out back-offs if needed.
+
+        Args:
+            deadline (Deadline, optional): Stop waiting for a token when it runs out.
+
+        Raises:
+            TokenPoolExhausted: If every token has been drained
+            DeadlineExceeded: If the deadline runs out while every token backs off
+        """
+        with self._condition:
+            while True:
+                live = [state for state in self._states if not state.drained]
+                if not live:
+                    raise TokenPoolExhausted("All API tokens were rejected")
+                now = time.monotonic()
+                ready = [state for state in live if state.backoff_until <= now]
+                if ready:
+                    state = min(ready, key=lambda state: state.in_flight)
+                    state.in_flight += 1
+                    state.requests += 1
+                    return state
+                wait = min(state.backoff_until for state in live) - now
+                remaining = deadline.remaining() if deadline is not None else None
+                if remaining is not None:
+                    if remaining <= 0:
+                        raise DeadlineExceeded(
+                            "Deadline exceeded waiting for a usable API token"
+                        )
+                    wait = min(wait, remaining)
+                self._condition.wait(wait)
+
+    def release(
+        self,
+        state: _TokenState,
+        status: Optional[int] = None,
+        retry_after: Optional[str] = None,
+    ) -> None:
+        """
+        Return a token to the pool, updating its health from the response.
+
+        Args:
+            state: The token reserved with acquire()
+            status (int, optional): HTTP status of the response, None if there was none
+            retry_after (str, optional): Retry-After header of a 429 response
+        """
+        with self._condition:
+            state.in_flight -= 1
+            if status == 429:
+                state.throttled += 1
+                state.consecutive_throttles += 1
+                state.backoff_until = time.monotonic() + self._backoff(
+                    state, retry_after
+                )
+            elif status in AUTH_ERROR_STATUSES:
+                state.auth_errors += 1
+                state.drained = True
+            elif status is not None and status < 400:
+                state.consecutive_throttles = 0
+            self._condition.notify_all()
+
+    def call(
+        self,
+        func: Callable[[str], T],
+        deadline: Optional[Deadline] = None,
+        retry: bool = True,
+    ) -> T:
+        """
+        Call `func` with a token from the pool.
+
+        Throttled or rejected requests are retried on another token, up to once
+        per token in the pool.
+
+        Args:
+            func (Callable[[str], T]): Makes the request with the given token
+            deadline (Deadline, optional): Stop waiting for a token when it runs out.
+            retry (bool, optional): Whether `func` can be called again, e.g. False when it consumes a one-shot stream. Defaults to True.
+
+        Returns:
+            T: Whatever `func` returns
+
+        Raises:
+            DeadlineExceeded: If the deadline runs out while waiting for a token
+        """
+        attempts = len(self._states) if retry else 1
+        for attempt in range(attempts):
+            state = self.acquire(deadline)
+            try:
+                result = func(state.token)
+            except httpx.HTTPStatusError as exc:
+                status = exc.response.status_code
+                self.release(state, status, exc.response.headers.get("Retry-After"))
+                retryable = status == 429 or status in AUTH_ERROR_STATUSES
+                if not retryable or attempt == attempts - 1:
+                    raise
+                continue
+            except BaseException:
+                self.release(state)
+                raise
+            self.release(state, 200)
+            return result
+        raise TokenPoolExhausted("No API token accepted the request")
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Return per-profile usage counters."""
+        with self._condition:
+            return {
+                state.name: {
+                    "requests": state.requests,
+                    "in_flight": state.in_flight,
+                    "throttled": state.throttled,
+                    "auth_errors": state.auth_errors,
+                    "drained": int(state.drained),
+                }
+                for state in self._states
+            }
+
+    @staticmethod
+    def _backoff(state: _TokenState, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                return min(MAX_BACKOFF, float(retry_after))
+            except ValueError:
+                pass
+        return min(MAX_BACKOFF, 2.0 ** (state.consecutive_throttles - 1))
+
@@ -1,24 +1,30 @@
 from typing import Any, Dict, Literal, Optional, Union
 
-from .base import process_image
+from .base import ImageSource, process_image
+from .timeouts import DEFAULT_TIMEOUT, Deadline, TimeoutTypes
+from .token_pool import TokenPool
 
 
 def upscale_image(
-    file_path: str,
+    file_path: ImageSource,
     mode: Literal["clarity", "generative"] = "clarity",
     response_format: Optional[str] = None,
-    timeout: int = 30,
+    timeout: TimeoutTypes = DEFAULT_TIMEOUT,
+    deadline: Optional[Deadline] = None,
+    token_pool: Optional[TokenPool] = None,
 ) -> Optional[Union[str, Dict[str, Any]]]:
     """
     Enhances a given raster image using upscaling techniques.
 
     Args:
-        file_path (str): Path to the PNG image to upscale
+        file_path (ImageSource): Path to the PNG image to upscale, or a binary stream
         mode (str, optional): Upscaling mode. Defaults to 'clarity'.
             - 'clarity': Enhances resolution with clarity
             - 'generative': Enhances resolution with generative details, focusing on small details and faces
         response_format (str, optional): Format of the response. Defaults to None (url).
-        timeout (int, optional): Timeout for the API request. Defaults to 30 seconds.
+        timeout (TimeoutTypes, optional): Timeout for the API request, in seconds or per phase. Defaults to 60 seconds.
+        deadline (Deadline, optional): End-to-end deadline for the request.
+        token_pool (TokenPool, optional): Tokens to spread requests over. Defaults to the stored token.
 
     Returns:
         Optional[Union[str, Dict[str, Any]]]: Upscaled image URL or base64 JSON, or None if upscaling fails
@@ -48,19 +54,27 @@ def upscale_image(
         operation_name=operation_names[mode],
         response_format=response_format,
         timeout=timeout,
+        deadline=deadline,
+        token_pool=token_pool,
     )
 
 
 def clarity_upscale(
-    file_path: str, response_format: Optional[str] = None, timeout: int = 30
+    file_path: ImageSource,
+    response_format: Optional[str] = None,
+    timeout: TimeoutTypes = DEFAULT_TIMEOUT,
+    deadline: Optional[Deadline] = None,
+    token_pool: Optional[TokenPool] = None,
 ) -> Optional[Union[str, Dict[str, Any]]]:
     """
     Shorthand for upscale_image with clarity mode.
 
     Args:
-        file_path (str): Path to the PNG image to upscale
+        file_path (ImageSource): Path to the PNG image to upscale, or a binary stream
         response_format (str, optional): Format of the response. Defaults to None (url).
-        timeout (int, optional): Timeout for the API request. Defaults to 30 seconds.
+        timeout (TimeoutTypes, optional): Timeout for the API request, in seconds or per phase. Defaults to 60 seconds.
+        deadline (Deadline, optional): End-to-end deadline for the request.
+        token_pool (TokenPool, optional): Tokens to spread requests over. Defaults to the stored token.
 
     Returns:
         Optional[Union[str, Dict[str, Any]]]: Upscaled image URL or base64 JSON, or None if upscaling fails
@@ -70,19 +84,27 @@ def clarity_upscale(
         mode="clarity",
         response_format=response_format,
         timeout=timeout,
+        deadline=deadline,
+        token_pool=token_pool,
     )
 
 
 def generative_upscale(
-    file_path: str, response_format: Optional[str] = None, timeout: int = 30
+    file_path: ImageSource,
+    response_format: Optional[str] = None,
+    timeout: TimeoutTypes = DEFAULT_TIMEOUT,
+    deadline: Optional[Deadline] = None,
+    token_pool: Optional[TokenPool] = None,
 ) -> Optional[Union[str, Dict[str, Any]]]:
     """
     Shorthand for upscale_image with generative mode.
 
     Args:
-        file_path (str): Path to the PNG image to upscale
+        file_path (ImageSource): Path to the PNG image to upscale, or a binary stream
         response_format (str, optional): Format of the response. Defaults to None (url).
-        timeout (int, optional): Timeout for the API request. Defaults to 30 seconds.
+        timeout (TimeoutTypes, optional): Timeout for the API request, in seconds or per phase. Defaults to 60 seconds.
+        deadline (Deadline, optional): End-to-end deadline for the request.
+        token_pool (TokenPool, optional): Tokens to spread requests over. Defaults to the stored token.
 
     Returns:
         Optional[Union[str, Dict[str, Any]]]: Upscaled image URL or base64 JSON, or None if upscaling fails
@@ -92,4 +114,6 @@ def generative_upscale(
         mode="generative",
         response_format=response_format,
         timeout=timeout,
+        deadline=deadline,
+        token_pool=token_pool,
     )
@@ -0,0 +1,66 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Below this many bytes, shipping work to another process costs more than it saves
+INLINE_THRESHOLD = 256 * 1024
+
+# Worker count for the CPU pool, None for one per core; set by configure_workers()
+_workers: Optional[int] = None
+_pool: Optional[Executor] = None
+_pool_lock = threading.Lock()
+
+
+def configure_workers(count: Optional[int]) -> None:
+    """
+    Set the number of processes used for CPU-heavy local work.
+
+    Applies to the pool created on first use, so call it before any work.
+
+    Args:
+        count (int, optional): Worker processes, 0 to run everything inline. Defaults to one per core.
+    """
+    global _workers
+    with _pool_lock:
+        _workers = count
+
+
+def get_pool() -> Optional[Executor]:
+    """Return the shared CPU pool, or None when work runs inline."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = (os.cpu_count() or 1) if _workers is None else _workers
+            if workers < 1:
+                return None
+            # Spawn, as forking a process with running threads can deadlock
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def run_cpu(func: Callable[..., T], *args, size: Optional[int] = None) -> T:
+    """
+    Run a CPU-heavy function in the worker pool and wait for its result.
+
+    Blocking the calling thread on the result releases the GIL, so other jobs'
+    network I/O keeps flowing while the work runs on another core.
+
+    Args:
+        func (Callable[..., T]): Module-level (picklable) function to run
+        *args: Picklable arguments for `func`
+        size (int, optional): Payload size in bytes; small payloads run inline.
+
+    Returns:
+        T: Whatever `func` returns
+    """
+    pool = get_pool() if size is None or size >= INLINE_THRESHOLD else None
+    if pool is None:
+        return func(*args)
+    return pool.submit(func, *args).result()
+
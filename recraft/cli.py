@@ -2,6 +2,7 @@ import click
 
 from .commands.generate import generate
 from .commands.remove_bg import remove_bg
+from .commands.styles import styles
 from .commands.token import token
 from .commands.upscale import upscale
 
@@ -16,6 +17,7 @@ main.add_command(token)
 main.add_command(generate)
 main.add_command(upscale)
 main.add_command(remove_bg)
+main.add_command(styles)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,233 @@
+import hashlib
+import os
+from contextlib import nullcontext
+from typing import Any, BinaryIO, Callable, List, Optional, Tuple, Union
+
+import click
+
+from ..api_client import download_image
+from ..api_client.batch import JobResult, run_batch
+from ..api_client.convert import ImageConverter
+from ..api_client.hedge import HedgePolicy
+from ..api_client.progress import BatchProgress
+from ..api_client.sinks import StdoutSink, sink_from_uri
+from ..api_client.timeouts import Deadline, TimeoutTypes
+from .options import (
+    configure_batch_concurrency,
+    echo_concurrency,
+    echo_hedge_metrics,
+    echo_token_usage,
+)
+from .token import build_token_pool
+
+# Processes one input (a path, or the stdin stream) and returns the result URL
+ProcessFile = Callable[[Union[str, BinaryIO], Deadline, Any], Any]
+
+# Empty markers in the sink recording which input content produced each output
+SOURCES_DIR = ".recraft-sources"
+
+
+def output_filename(
+    file_path: str, suffix: str, converter: Optional[ImageConverter] = None
+) -> str:
+    """Return the output filename for an input: its name plus the command's suffix."""
+    filename_base, ext = os.path.splitext(os.path.basename(file_path))
+    filename = f"{filename_base}{suffix}{ext}"
+    return converter.rename(filename) if converter is not None else filename
+
+
+def source_marker(filename: str, file_path: str) -> str:
+    """
+    Return the sink name of the marker tying an output to its input's content.
+
+    The marker is named after the output and a SHA-256 of the input, so it only
+    exists once this exact input has been processed into this output.
+    """
+    with open(file_path, "rb") as input_file:
+        digest = hashlib.file_digest(input_file, "sha256").hexdigest()
+    return f"{SOURCES_DIR}/{filename}.{digest}"
+
+
+def check_file_inputs(file_paths: Tuple[str, ...], to_stdout: bool) -> None:
+    """Reject input combinations a file batch can't handle."""
+    if "-" in file_paths and len(file_paths) > 1:
+        raise click.UsageError("- (stdin) can't be combined with other images")
+    if to_stdout and len(file_paths) > 1:
+        raise click.UsageError("--stdout only supports a single image")
+
+
+def run_file_batch(
+    file_paths: Tuple[str, ...],
+    process: ProcessFile,
+    *,
+    suffix: str,
+    done_message: str,
+    skipped_message: str,
+    failed_message: str,
+    summary_message: str,
+    timeout: TimeoutTypes,
+    job_deadline: Optional[float],
+    converter: Optional[ImageConverter],
+    concurrency: int,
+    max_concurrency: Optional[int],
+    cpu_workers: Optional[int],
+    batch_deadline: Optional[float],
+    retries: int,
+    profiles: Tuple[str, ...],
+    all_profiles: bool,
+    no_download: bool,
+    output_dir: Optional[str],
+    to_stdout: bool,
+    hedge: Optional[HedgePolicy],
+    overwrite: bool,
+    dedupe: bool,
+    inline: bool = False,
+) -> List[JobResult[str]]:
+    """
+    Run an API operation over a batch of input images and download the results.
+
+    Outputs are named after their input plus `suffix`. An input is skipped when
+    its output exists and was made from the same input content, tracked by a
+    marker in the sink. Each result URL from `process` is downloaded to
+    the output sink, or to stdout with `to_stdout`, then the batch summaries are
+    shown. A job cut off by its deadline after `process` returned is rescheduled
+    to download the same result again rather than pay for processing twice.
+    The remaining keyword arguments are the command's timeout, output format,
+    batch, download and hedge options.
+
+    Args:
+        file_paths (Tuple[str, ...]): Input images, or "-" alone for stdin
+        process (ProcessFile): Sends one input to the API under the given deadline
+            and token pool, returning the result URL or None on failure
+        suffix (str): Appended to the input's name for the output filename
+        done_message (str): Shown with the result URL once an image is processed
+        skipped_message (str): Shown with the location of an existing output
+        failed_message (str): Shown for a failed job; may use {item}
+        summary_message (str): Shown after a batch; may use {succeeded} and {total}
+        inline (bool, optional): `process` returns results inline and handles
+            them itself, so nothing is downloaded. Defaults to False.
+
+    Returns:
+        List[JobResult[str]]: One result per input, in input order. Exits with
+            status 1 instead once the summaries are shown if any input failed.
+    """
+    # With --stdout, stdout carries the image so all messages go to stderr
+    err = to_stdout
+    sink = sink_from_uri(output_dir, dedupe=dedupe)
+    downloads = not (inline or to_stdout or no_download)
+    # Several images share one aggregate dashboard instead of per-job output
+    batch_progress = BatchProgress(len(file_paths)) if len(file_paths) > 1 else None
+    # Result URLs by input, so a job cut off while downloading isn't processed again
+    processed = {}
+
+    if downloads:
+        # Different inputs with the same name would overwrite each other's output
+        sources = {}
+        for file_path in file_paths:
+            filename = output_filename(file_path, suffix, converter)
+            other = sources.setdefault(filename, file_path)
+            if other != file_path:
+                raise click.UsageError(
+                    f"{other} and {file_path} would both be saved as {filename}"
+                )
+
+    def run_file(file_path: str, deadline: Deadline) -> Optional[str]:
+        custom_filename = marker = None
+        if file_path != "-":
+            custom_filename = output_filename(file_path, suffix, converter)
+            if downloads:
+                marker = source_marker(custom_filename, file_path)
+
+            # An existing output is complete (sinks write atomically), skip the job
+            if (
+                marker is not None
+                and not overwrite
+                and sink.exists(marker)
+                and sink.exists(custom_filename)
+            ):
+                location = sink.location(custom_filename)
+                if batch_progress is None:
+                    click.echo(
+                        click.style(f"\n⏭️  {skipped_message}: {location}", fg="yellow"),
+                        err=err,
+                    )
+                return location
+
+        result = processed.get(file_path)
+        if result is None:
+            source = click.get_binary_stream("stdin") if file_path == "-" else file_path
+            result = process(source, deadline, token_pool)
+            if not result or inline:
+                return result
+            processed[file_path] = result
+            if batch_progress is None:
+                success_msg = click.style(
+                    f"\n✅ {done_message}: {result}", fg="bright_green"
+                )
+                click.echo(success_msg, err=err)
+
+        if to_stdout:
+            return download_image(
+                result,
+                sink=StdoutSink(),
+                hedge=hedge,
+                timeout=timeout,
+                deadline=deadline,
+                converter=converter,
+            )
+        if no_download:
+            return result
+
+        # Any existing output came from other input (or --overwrite), so replace it
+        location = download_image(
+            result,
+            custom_filename=custom_filename,
+            sink=sink,
+            hedge=hedge,
+            timeout=timeout,
+            deadline=deadline,
+            converter=converter,
+        )
+        if location is not None and marker is not None:
+            sink.write_stream(marker, [])
+        return location
+
+    workers = configure_batch_concurrency(
+        concurrency,
+        max_concurrency,
+        # A single image has nothing to overlap with, so don't start worker processes
+        cpu_workers if len(file_paths) > 1 else 0,
+    )
+    # Resolve tokens up front so concurrent jobs never race to prompt for them
+    token_pool = build_token_pool(profiles, all_profiles)
+    with batch_progress or nullcontext():
+        results = run_batch(
+            file_paths,
+            run_file,
+            concurrency=workers,
+            job_timeout=job_deadline,
+            batch_timeout=batch_deadline,
+            # stdin can only be read once, so it can't be rescheduled
+            retries=0 if "-" in file_paths else retries,
+            progress=batch_progress,
+        )
+    for result in results:
+        if result.error is not None:
+            error_msg = click.style(
+                f"\n❌ {failed_message.format(item=result.item)}: {result.error}",
+                fg="bright_red",
+            )
+            click.echo(error_msg, err=err)
+    if len(results) > 1:
+        succeeded = sum(result.ok for result in results)
+        summary = summary_message.format(succeeded=succeeded, total=len(results))
+        click.echo(f"\n{summary}", err=err)
+    echo_token_usage(token_pool, err=err)
+    if hedge is not None:
+        echo_hedge_metrics(hedge, err=err)
+    if max_concurrency:
+        echo_concurrency(err=err)
+    if not all(result.ok for result in results):
+        # Failures were reported above; make them visible to scripts too
+        click.get_current_context().exit(1)
+    return results
@@ -2,57 +2,101 @@ from typing import Optional
 
 import click
 
-from ..api_client import download_image, generate_image
-from ..api_client.generate import ALLOWED_STYLES
-
-# Style categories and their corresponding styles
-STYLE_CATEGORIES = {
-    "1": {"name": "Any Style (Random)", "styles": ["any"]},
-    "2": {
-        "name": "Realistic Image",
-        "styles": [
-            style
-            for style in ALLOWED_STYLES
-            if style.startswith("realistic_image") and style != "any"
-        ],
-    },
-    "3": {
-        "name": "Digital Illustration",
-        "styles": [
-            style
-            for style in ALLOWED_STYLES
-            if style.startswith("digital_illustration")
-        ],
-    },
-    "4": {
-        "name": "Vector Illustration",
-        "styles": [
-            style for style in ALLOWED_STYLES if style.startswith("vector_illustration")
-        ],
-    },
-}
+from ..api_client import download_image, generate_image, save_base64_image
+from ..api_client.client import prewarm
+from ..api_client.convert import ImageConverter
+from ..api_client.sinks import sink_from_uri
+from ..api_client.styles import STYLE_CATEGORIES, get_style_registry
+from ..api_client.generate import (
+    IMAGE_SIZES,
+    choose_response_format,
+    is_vector_style,
+)
+from ..api_client.timeouts import Deadline, DeadlineExceeded, TimeoutTypes
+from ..api_client.workers import configure_workers
+from .options import output_dir_option, output_format_options, timeout_options
+from .token import DEFAULT_PROFILE, build_token_pool
+
+
+def style_categories():
+    """
+    Build the numbered style category menu from the style registry.
+
+    The account's custom styles, if any, follow as a last category, labelled
+    with the base style they were made from.
+
+    Returns:
+        dict: Mapping of menu number to category name, styles and their labels
+    """
+    styles = get_style_registry()
+    categories = {
+        str(number): {
+            "name": name,
+            "styles": styles.category(prefix),
+            "labels": styles.category(prefix),
+        }
+        for number, (prefix, name) in enumerate(STYLE_CATEGORIES, 1)
+    }
+    custom_styles = styles.custom_styles
+    if custom_styles:
+        categories[str(len(categories) + 1)] = {
+            "name": "Custom",
+            "styles": list(custom_styles),
+            "labels": [
+                f"{style_id} ({base_style})"
+                for style_id, base_style in custom_styles.items()
+            ],
+        }
+    return categories
 
 
 @click.command()
 @click.argument("prompt", required=False)
 @click.option("--style", default=None, help="Style of the generated image")
-@click.option("--timeout", default=60, help="Timeout for the API request in seconds")
+@click.option(
+    "--size", type=click.Choice(IMAGE_SIZES), help="Size of the generated image"
+)
+@click.option(
+    "--response-format",
+    type=click.Choice(["auto", "url", "base64"]),
+    default="auto",
+    show_default=True,
+    help="Return the image inline (base64) or as a URL; auto picks by expected size",
+)
+@timeout_options
+@output_format_options
 @click.option("--no-download", is_flag=True, help="Skip automatic image download")
+@output_dir_option
 @click.option(
-    "--output-dir",
-    type=click.Path(file_okay=False, dir_okay=True, writable=True, resolve_path=True),
-    default=None,
-    help="Directory to save downloaded image",
+    "--dedupe", is_flag=True, help="Hardlink identical downloaded images to one copy"
+)
+@click.option(
+    "--profile",
+    default=DEFAULT_PROFILE,
+    show_default=True,
+    help="Token profile to use",
 )
 def generate(
     prompt: Optional[str],
     style: Optional[str],
-    timeout: int,
+    size: Optional[str],
+    response_format: str,
+    timeout: TimeoutTypes,
+    job_deadline: Optional[float],
+    converter: Optional[ImageConverter],
     no_download: bool,
     output_dir: Optional[str],
+    dedupe: bool,
+    profile: str,
 ):
     """Generate an image using the Recraft API."""
     click.echo(click.style("\n🖌️  Image Generation 🖌️", fg="bright_cyan", bold=True))
+    # Warm up the token and API connection while the user answers prompts
+    prewarm()
+    if response_format == "base64" and no_download:
+        raise click.UsageError("--no-download needs --response-format url")
+    # A single image has nothing to overlap with, so don't start worker processes
+    configure_workers(0)
 
     # If no prompt provided, ask the user
     if not prompt:
@@ -66,8 +110,9 @@ def generate(
 
     # If no style provided, guide user through selection
     if not style:
+        categories = style_categories()
         click.echo("\nChoose a style category:")
-        for key, category in STYLE_CATEGORIES.items():
+        for key, category in categories.items():
             click.echo(f"{key}. {category['name']}")
 
         while True:
@@ -76,8 +121,8 @@ def generate(
                 type=str,
             )
 
-            if category_choice in STYLE_CATEGORIES:
-                selected_category = STYLE_CATEGORIES[category_choice]
+            if category_choice in categories:
+                selected_category = categories[category_choice]
 
                 # If "Any" style is selected, use it directly
                 if selected_category["styles"] == ["any"]:
@@ -89,8 +134,8 @@ def generate(
                         f"\nAvailable {selected_category['name']} Styles:", fg="green"
                     )
                 )
-                for i, sub_style in enumerate(selected_category["styles"], 1):
-                    click.echo(f"{i}. {sub_style}")
+                for i, label in enumerate(selected_category["labels"], 1):
+                    click.echo(f"{i}. {label}")
 
                 while True:
                     sub_style_choice = click.prompt(
@@ -120,11 +165,65 @@ def generate(
             else:
                 click.echo(click.style("Invalid category. Please try again.", fg="red"))
 
-    image_url = generate_image(prompt, style, timeout)
-    if image_url:
-        click.echo(
-            click.style(f"Image generated successfully: {image_url}", fg="bright_green")
+    if converter is not None and is_vector_style(style):
+        raise click.UsageError(
+            f"--output-format can't convert the vector (SVG) images of style '{style}'"
+        )
+
+    if response_format == "auto":
+        response_format = "url" if no_download else choose_response_format(style, size)
+    elif response_format == "base64":
+        response_format = "b64_json"
+
+    # The deadline starts once the interactive prompts are done
+    deadline = Deadline(job_deadline)
+    try:
+        token_pool = build_token_pool([profile])
+        result = generate_image(
+            prompt,
+            style,
+            timeout,
+            deadline,
+            token_pool,
+            size=size,
+            response_format=response_format,
         )
+        if isinstance(result, dict):
+            # The image came inline: decode it straight to its destination
+            saved = save_base64_image(
+                result["data"][0]["b64_json"],
+                sink=sink_from_uri(output_dir, dedupe=dedupe),
+                skip_existing=True,
+                converter=converter,
+            )
+        elif result:
+            click.echo(
+                click.style(
+                    f"Image generated successfully: {result}", fg="bright_green"
+                )
+            )
 
-        if not no_download:
-            download_image(image_url, output_dir)
+            saved = result
+            if not no_download:
+                saved = download_image(
+                    result,
+                    sink=sink_from_uri(output_dir, dedupe=dedupe),
+                    timeout=timeout,
+                    deadline=deadline,
+                    skip_existing=True,
+                    converter=converter,
+                )
+        else:
+            saved = None
+    except DeadlineExceeded:
+        click.echo(
+            click.style(
+                f"\n❌ Generation did not finish within {job_deadline} seconds",
+                fg="bright_red",
+            ),
+            err=True,
+        )
+        saved = None
+    if saved is None:
+        # The failure was reported above; make it visible to scripts too
+        click.get_current_context().exit(1)
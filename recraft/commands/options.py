@@ -0,0 +1,280 @@
+import functools
+import os
+
+import click
+
+from ..api_client.concurrency import configure_concurrency, limiter_stats
+from ..api_client.convert import OUTPUT_FORMATS, ImageConverter
+from ..api_client.hedge import HedgePolicy
+from ..api_client.timeouts import DEFAULT_TIMEOUT, build_timeout
+from ..api_client.workers import configure_workers
+
+
+def timeout_options(func):
+    """
+    Add the per-phase timeout options and the per-job deadline to a command.
+
+    The phase options are combined into a single httpx.Timeout passed to the
+    command as `timeout`.
+    """
+
+    @functools.wraps(func)
+    def wrapper(
+        *args,
+        timeout,
+        connect_timeout,
+        read_timeout,
+        write_timeout,
+        pool_timeout,
+        **kwargs,
+    ):
+        timeout = build_timeout(
+            timeout,
+            connect=connect_timeout,
+            read=read_timeout,
+            write=write_timeout,
+            pool=pool_timeout,
+        )
+        return func(*args, timeout=timeout, **kwargs)
+
+    options = [
+        click.option(
+            "--timeout",
+            default=DEFAULT_TIMEOUT,
+            type=float,
+            show_default=True,
+            help="Timeout for each phase of a request in seconds",
+        ),
+        click.option(
+            "--connect-timeout",
+            type=float,
+            help="Timeout for establishing a connection",
+        ),
+        click.option(
+            "--read-timeout",
+            type=float,
+            help="Timeout waiting for response data, including API processing",
+        ),
+        click.option("--write-timeout", type=float, help="Timeout sending request data"),
+        click.option(
+            "--pool-timeout", type=float, help="Timeout waiting for a free connection"
+        ),
+        click.option(
+            "--job-deadline",
+            type=float,
+            help="Overall seconds allowed per image, from upload to download",
+        ),
+    ]
+    for option in reversed(options):
+        wrapper = option(wrapper)
+    return wrapper
+
+
+def output_format_options(func):
+    """
+    Add the output format conversion options to a command.
+
+    The options are combined into an ImageConverter (or None) passed to the
+    command as `converter`.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, output_format, quality, **kwargs):
+        if quality is not None and output_format is None:
+            raise click.UsageError("--quality needs --output-format")
+        converter = ImageConverter(output_format, quality) if output_format else None
+        return func(*args, converter=converter, **kwargs)
+
+    options = [
+        click.option(
+            "--output-format",
+            type=click.Choice(list(OUTPUT_FORMATS)),
+            help="Convert downloaded images to this format as they are saved",
+        ),
+        click.option(
+            "--quality",
+            type=click.IntRange(1, 100),
+            help="Encoder quality for --output-format",
+        ),
+    ]
+    for option in reversed(options):
+        wrapper = option(wrapper)
+    return wrapper
+
+
+def hedge_options(func):
+    """
+    Add the download hedging options to a command.
+
+    The options are combined into a HedgePolicy (or None) passed to the command
+    as `hedge`. The percentile needs a few downloads to learn from, so hedging
+    suits batches; until then a fixed delay is used.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, hedge_percentile, max_hedges, **kwargs):
+        hedge = HedgePolicy(hedge_percentile, max_hedges) if hedge_percentile else None
+        return func(*args, hedge=hedge, **kwargs)
+
+    options = [
+        click.option(
+            "--hedge-percentile",
+            type=click.FloatRange(1, 100),
+            default=None,
+            help="Re-send a slow download once it exceeds this latency percentile",
+        ),
+        click.option(
+            "--max-hedges",
+            default=5,
+            show_default=True,
+            type=click.IntRange(0),
+            help="Most downloads re-sent by --hedge-percentile",
+        ),
+    ]
+    for option in reversed(options):
+        wrapper = option(wrapper)
+    return wrapper
+
+
+def _validate_output_dir(ctx, param, value):
+    if value is None or value.startswith("s3://"):
+        # Bucket access is only known once the first upload is attempted
+        return value
+    if value == "-":
+        # Status messages go to stdout too, so only --stdout may write the image there
+        hint = ""
+        if any(option.name == "to_stdout" for option in ctx.command.params):
+            hint = "; use --stdout to write the image to stdout"
+        raise click.BadParameter(f"'-' is not a directory{hint}", ctx=ctx, param=param)
+    path = click.Path(file_okay=False, writable=True, resolve_path=True).convert(
+        value, param, ctx
+    )
+    # A missing directory is created on first write; check that it can be
+    parent = path
+    while not os.path.exists(parent):
+        parent = os.path.dirname(parent)
+    if not os.path.isdir(parent) or not os.access(parent, os.W_OK | os.X_OK):
+        raise click.BadParameter(
+            f"Directory '{value}' can't be created under '{parent}'",
+            ctx=ctx,
+            param=param,
+        )
+    return path
+
+
+def output_dir_option(func):
+    """
+    Add the --output-dir destination option to a command.
+
+    Local directories are checked before any API credits are spent.
+    """
+    return click.option(
+        "--output-dir",
+        default=None,
+        callback=_validate_output_dir,
+        help="Directory to save downloaded image, or s3://bucket/prefix",
+    )(func)
+
+
+def batch_options(func):
+    """Add the concurrency, worker, deadline and token profile options to a command."""
+    options = [
+        click.option(
+            "--concurrency",
+            default=4,
+            show_default=True,
+            type=click.IntRange(1),
+            help=(
+                "Number of images processed at once, "
+                "or the starting point with --max-concurrency"
+            ),
+        ),
+        click.option(
+            "--max-concurrency",
+            type=click.IntRange(1),
+            help=(
+                "Adapt concurrency per endpoint up to this limit, "
+                "backing off on 429s, 5xx and rising latency"
+            ),
+        ),
+        click.option(
+            "--cpu-workers",
+            type=click.IntRange(0),
+            help=(
+                "Processes for CPU-heavy work such as converting images; "
+                "0 runs it inline. Defaults to one per core"
+            ),
+        ),
+        click.option(
+            "--batch-deadline",
+            type=float,
+            help="Overall seconds allowed for the whole batch",
+        ),
+        click.option(
+            "--retries",
+            default=1,
+            show_default=True,
+            type=click.IntRange(0),
+            help="Times a job cut off by its deadline is rescheduled",
+        ),
+        click.option(
+            "--profile",
+            "profiles",
+            multiple=True,
+            help="Token profile to use; repeat to spread jobs across several accounts",
+        ),
+        click.option(
+            "--all-profiles",
+            is_flag=True,
+            help="Spread jobs across every stored token profile",
+        ),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def echo_token_usage(token_pool, err=False):
+    """Show per-profile request counts when a batch used several tokens."""
+    if len(token_pool) < 2:
+        return
+    click.echo("\nToken usage:", err=err)
+    for name, stats in token_pool.stats().items():
+        status = " (drained)" if stats["drained"] else ""
+        click.echo(
+            f"  {name}: {stats['requests']} requests, "
+            f"{stats['throttled']} throttled{status}",
+            err=err,
+        )
+
+
+def configure_batch_concurrency(concurrency, max_concurrency, cpu_workers=None):
+    """
+    Set up the per-endpoint request limits and the CPU worker pool for a batch.
+
+    Returns:
+        int: Number of jobs to run at once, enough to fill the highest limit
+    """
+    configure_concurrency(concurrency, max_concurrency)
+    configure_workers(cpu_workers)
+    return max(concurrency, max_concurrency or 0)
+
+
+def echo_concurrency(err=False):
+    """Show the request concurrency each endpoint settled at."""
+    for name, stats in limiter_stats().items():
+        click.echo(
+            f"Concurrency for {name}: {stats['limit']} "
+            f"({stats['decreases']} back-offs over {stats['requests']} requests)",
+            err=err,
+        )
+
+
+def echo_hedge_metrics(hedge, err=False):
+    """Show how many downloads were hedged and how many hedges won."""
+    metrics = hedge.metrics()
+    click.echo(
+        f"Hedged downloads: {metrics['hedges_fired']} of {metrics['requests']}, "
+        f"{metrics['hedges_won']} answered first",
+        err=err,
+    )
@@ -1,16 +1,37 @@
-import os
-from typing import Optional
+import base64
+from typing import Optional, Tuple
 
 import click
 
-from ..api_client import download_image, remove_background
+from ..api_client import remove_background
+from ..api_client.client import prewarm
+from ..api_client.convert import ImageConverter
+from ..api_client.hedge import HedgePolicy
+from ..api_client.progress import echo_status
+from ..api_client.sinks import StdoutSink
+from ..api_client.timeouts import Deadline, TimeoutTypes
+from .batch import check_file_inputs, run_file_batch
+from .options import (
+    batch_options,
+    hedge_options,
+    output_dir_option,
+    output_format_options,
+    timeout_options,
+)
 
 
 @click.command()
 @click.argument(
-    "file_path",
+    "file_paths",
+    nargs=-1,
+    required=True,
     type=click.Path(
-        exists=True, dir_okay=False, file_okay=True, readable=True, resolve_path=True
+        exists=True,
+        dir_okay=False,
+        file_okay=True,
+        readable=True,
+        resolve_path=True,
+        allow_dash=True,
     ),
 )
 @click.option(
@@ -18,56 +39,112 @@ from ..api_client import download_image, remove_background
     type=click.Choice(["url", "base64"]),
     help="Format of the response (default: url)",
 )
-@click.option("--timeout", default=60, help="Timeout for the API request in seconds")
+@timeout_options
+@output_format_options
+@batch_options
 @click.option("--no-download", is_flag=True, help="Skip automatic image download")
+@output_dir_option
+@click.option(
+    "--stdout", "to_stdout", is_flag=True, help="Write the raw result image to stdout"
+)
+@hedge_options
+@click.option(
+    "--overwrite",
+    is_flag=True,
+    help="Process and download again even if the output file already exists",
+)
 @click.option(
-    "--output-dir",
-    type=click.Path(file_okay=False, dir_okay=True, writable=True, resolve_path=True),
-    default=None,
-    help="Directory to save downloaded image",
+    "--dedupe", is_flag=True, help="Hardlink identical downloaded images to one copy"
 )
 def remove_bg(
-    file_path: str,
+    file_paths: Tuple[str, ...],
     response_format: Optional[str],
-    timeout: int,
+    timeout: TimeoutTypes,
+    job_deadline: Optional[float],
+    converter: Optional[ImageConverter],
+    concurrency: int,
+    max_concurrency: Optional[int],
+    cpu_workers: Optional[int],
+    batch_deadline: Optional[float],
+    retries: int,
+    profiles: Tuple[str, ...],
+    all_profiles: bool,
     no_download: bool,
     output_dir: Optional[str],
+    to_stdout: bool,
+    hedge: Optional[HedgePolicy],
+    overwrite: bool,
+    dedupe: bool,
 ):
-    """Remove background from an image."""
-    click.echo(click.style("\n🖼️  Background Removal 🖼️", fg="bright_cyan", bold=True))
+    """Remove background from one or more images.
+
+    Use - as the only FILE_PATH to read the image from stdin.
+    """
+    # With --stdout, stdout carries the image so all messages go to stderr
+    err = to_stdout
+    click.echo(
+        click.style("\n🖼️  Background Removal 🖼️", fg="bright_cyan", bold=True),
+        err=err,
+    )
+    # Warm up the token and API connection while the input is prepared
+    prewarm()
+
+    check_file_inputs(file_paths, to_stdout)
 
     # If no response format provided, default to URL
     if response_format is None:
         response_format = "url"
 
-    try:
+    def remove_bg_file(source, deadline: Deadline, token_pool):
         result = remove_background(
-            file_path, response_format=response_format, timeout=timeout
+            source,
+            response_format=response_format,
+            timeout=timeout,
+            deadline=deadline,
+            token_pool=token_pool,
         )
+        if not result or response_format == "url":
+            return result
 
-        if result:
-            # If result is a URL and download is not skipped, download the image
-            if response_format == "url":
-                success_msg = click.style(
-                    f"\n✅ Background removed successfully: {result}", fg="bright_green"
-                )
-                click.echo(success_msg)
+        if to_stdout:
+            # Decode the inline image straight to stdout
+            chunks = [base64.b64decode(result["image"]["b64_json"])]
+            if converter is not None:
+                chunks = converter.convert(chunks)
+            return StdoutSink().write_stream("", chunks)
 
-                if not no_download:
-                    # Generate custom filename with "-removed-bg" suffix
-                    original_filename = os.path.basename(file_path)
-                    filename_base, ext = os.path.splitext(original_filename)
-                    custom_filename = f"{filename_base}-removed-bg{ext}"
+        # If base64, just show the result
+        name = source if isinstance(source, str) else "-"
+        echo_status(
+            click.style(f"\n✅ Background removed successfully: {name}", fg="bright_green")
+        )
+        echo_status(click.style(f"Result: {result}", fg="bright_blue"))
+        return result
 
-                    # Download with custom filename
-                    download_image(result, output_dir, custom_filename)
-            else:
-                # If base64, just show the result
-                click.echo(
-                    click.style(
-                        "\n✅ Background removed successfully!", fg="bright_green"
-                    )
-                )
-                click.echo(click.style(f"Result: {result}", fg="bright_blue"))
-    except Exception as e:
-        click.echo(click.style(f"\n❌ Background removal failed: {e}", fg="bright_red"))
+    run_file_batch(
+        file_paths,
+        remove_bg_file,
+        suffix="-removed-bg",
+        done_message="Background removed successfully",
+        skipped_message="Background already removed",
+        failed_message="Background removal failed for {item}",
+        summary_message="Removed background from {succeeded} of {total} images.",
+        timeout=timeout,
+        job_deadline=job_deadline,
+        converter=converter,
+        concurrency=concurrency,
+        max_concurrency=max_concurrency,
+        cpu_workers=cpu_workers,
+        batch_deadline=batch_deadline,
+        retries=retries,
+        profiles=profiles,
+        all_profiles=all_profiles,
+        no_download=no_download,
+        output_dir=output_dir,
+        to_stdout=to_stdout,
+        hedge=hedge,
+        overwrite=overwrite,
+        dedupe=dedupe,
+        # Inline results are shown or written to stdout by remove_bg_file itself
+        inline=response_format == "base64",
+    )
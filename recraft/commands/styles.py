@@ -0,0 +1,64 @@
+import click
+import httpx
+
+from ..api_client.styles import (
+    STYLE_CATEGORIES,
+    get_style_registry,
+    refresh_styles,
+)
+from .token import ensure_token
+
+
+@click.command()
+@click.argument("prefix", required=False)
+@click.option(
+    "--refresh", is_flag=True, help="Refresh the cached style catalogue from the API"
+)
+@click.option("--timeout", default=60, help="Timeout for the API request in seconds")
+def styles(prefix, refresh, timeout):
+    """List the available image styles, optionally filtered by PREFIX."""
+    registry = get_style_registry()
+
+    if refresh:
+        try:
+            registry = refresh_styles(ensure_token(), timeout)
+            click.echo(
+                click.style(
+                    f"✅ Style catalogue refreshed ({len(registry)} styles)",
+                    fg="bright_green",
+                )
+            )
+        except (httpx.HTTPError, ValueError) as exc:
+            click.echo(
+                click.style(f"❌ Could not refresh styles: {exc}", fg="bright_red")
+            )
+
+    if prefix:
+        matches = registry.with_prefix(prefix)
+        if not matches:
+            suggestions = registry.suggest(prefix)
+            hint = f" Did you mean: {', '.join(suggestions)}?" if suggestions else ""
+            click.echo(click.style(f"No styles match '{prefix}'.{hint}", fg="red"))
+            return
+        for style in matches:
+            click.echo(style)
+        return
+
+    listed = set()
+    for category_prefix, name in STYLE_CATEGORIES:
+        category_styles = registry.category(category_prefix)
+        listed.update(category_styles)
+        click.echo(click.style(f"\n{name}:", fg="green"))
+        for style in category_styles:
+            click.echo(f"  {style}")
+
+    other_styles = [style for style in registry if style not in listed]
+    if other_styles:
+        click.echo(click.style("\nOther:", fg="green"))
+        for style in other_styles:
+            click.echo(f"  {style}")
+
+    if registry.custom_styles:
+        click.echo(click.style("\nCustom (use the ID as --style):", fg="green"))
+        for style_id, base_style in registry.custom_styles.items():
+            click.echo(f"  {style_id} ({base_style})")
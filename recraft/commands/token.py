@@ -1,28 +1,133 @@
+import json
+import threading
+from concurrent.futures import Future
+from typing import List, Optional, Sequence
+
 import click
 import keyring
 
+DEFAULT_PROFILE = "default"
+
+# Background keyring lookup of the default token, started by prefetch_token()
+_prefetched: Optional[Future] = None
+
 
 @click.command()
 @click.argument("token", required=False)
-def token(token):
+@click.option(
+    "--profile",
+    default=DEFAULT_PROFILE,
+    show_default=True,
+    help="Name of the token profile, to keep tokens for several accounts",
+)
+@click.option("--list", "list_only", is_flag=True, help="List stored token profiles")
+def token(token, profile, list_only):
     """Set the Recraft API token in the system keychain."""
+    if list_only:
+        for name in list_profiles():
+            click.echo(name)
+        return
+
     if not token:
         token = click.prompt("Enter your Recraft API token", hide_input=True)
 
-    keyring.set_password("recraft-cli", "api_token", token)
+    store_token(token, profile)
     click.echo("API token has been securely stored in the system keychain.")
 
 
-def ensure_token():
+def _username(profile: str) -> str:
+    # The default profile keeps the original keychain entry name
+    return "api_token" if profile == DEFAULT_PROFILE else f"api_token:{profile}"
+
+
+def list_profiles() -> List[str]:
+    """Return the names of the stored token profiles."""
+    stored = keyring.get_password("recraft-cli", "profiles")
+    profiles = json.loads(stored) if stored else []
+    if DEFAULT_PROFILE not in profiles and keyring.get_password(
+        "recraft-cli", _username(DEFAULT_PROFILE)
+    ):
+        profiles.insert(0, DEFAULT_PROFILE)
+    return profiles
+
+
+def store_token(token, profile=DEFAULT_PROFILE):
+    """Store the API token for a profile in the system keychain."""
+    global _prefetched
+    keyring.set_password("recraft-cli", _username(profile), token)
+    profiles = list_profiles()
+    if profile not in profiles:
+        profiles.append(profile)
+        keyring.set_password("recraft-cli", "profiles", json.dumps(profiles))
+    if profile == DEFAULT_PROFILE:
+        _prefetched = None
+
+
+def prefetch_token():
+    """
+    Start looking up the stored token in the background.
+
+    Keychain backends can be slow to unlock or answer, so commands start the
+    lookup early and ensure_token() picks up the result.
+    """
+    global _prefetched
+    if _prefetched is not None:
+        return
+    future = Future()
+
+    def lookup():
+        try:
+            future.set_result(
+                keyring.get_password("recraft-cli", _username(DEFAULT_PROFILE))
+            )
+        except Exception as exc:
+            future.set_exception(exc)
+
+    _prefetched = future
+    threading.Thread(target=lookup, name="recraft-token", daemon=True).start()
+
+
+def _stored_token(profile):
+    if profile == DEFAULT_PROFILE and _prefetched is not None:
+        try:
+            return _prefetched.result()
+        except Exception:
+            pass
+    return keyring.get_password("recraft-cli", _username(profile))
+
+
+def ensure_token(profile=DEFAULT_PROFILE):
     """
     Check if token exists, and if not, prompt user to set it.
 
     Returns the API token.
     """
-    token = keyring.get_password("recraft-cli", "api_token")
+    token = _stored_token(profile)
     if not token:
-        click.echo("No API token found. Please set your Recraft API token.")
+        if profile == DEFAULT_PROFILE:
+            click.echo("No API token found. Please set your Recraft API token.")
+        else:
+            click.echo(f"No API token found for profile '{profile}'.")
         token = click.prompt("Enter your Recraft API token", hide_input=True)
-        keyring.set_password("recraft-cli", "api_token", token)
+        store_token(token, profile)
         click.echo("Token has been securely stored in the system keychain.")
     return token
+
+
+def build_token_pool(profiles: Sequence[str] = (), all_profiles: bool = False):
+    """
+    Build a token pool spreading requests across several token profiles.
+
+    Args:
+        profiles (Sequence[str], optional): Profile names. Defaults to the default profile.
+        all_profiles (bool, optional): Use every stored profile. Defaults to False.
+
+    Returns:
+        TokenPool: Pool of the profiles' tokens
+    """
+    from ..api_client.token_pool import TokenPool
+
+    names = list_profiles() if all_profiles else list(profiles)
+    if not names:
+        names = [DEFAULT_PROFILE]
+    return TokenPool({name: ensure_token(name) for name in dict.fromkeys(names)})
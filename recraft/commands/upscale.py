@@ -1,52 +1,112 @@
-import os
-from typing import Optional
+from typing import Optional, Tuple
 
 import click
 
-from ..api_client import download_image, upscale_image
+from ..api_client import upscale_image
+from ..api_client.client import prewarm
+from ..api_client.convert import ImageConverter
+from ..api_client.hedge import HedgePolicy
+from ..api_client.timeouts import Deadline, TimeoutTypes
+from .batch import check_file_inputs, run_file_batch
+from .options import (
+    batch_options,
+    hedge_options,
+    output_dir_option,
+    output_format_options,
+    timeout_options,
+)
 
 
 @click.command()
 @click.argument(
-    "file_path",
+    "file_paths",
+    nargs=-1,
+    required=True,
     type=click.Path(
-        exists=True, dir_okay=False, file_okay=True, readable=True, resolve_path=True
+        exists=True,
+        dir_okay=False,
+        file_okay=True,
+        readable=True,
+        resolve_path=True,
+        allow_dash=True,
     ),
 )
 @click.option(
     "--mode", type=click.Choice(["clarity", "generative"]), help="Upscaling mode"
 )
-@click.option("--timeout", default=60, help="Timeout for the API request in seconds")
+@timeout_options
+@output_format_options
+@batch_options
 @click.option("--no-download", is_flag=True, help="Skip automatic image download")
+@output_dir_option
+@click.option(
+    "--stdout", "to_stdout", is_flag=True, help="Write the raw result image to stdout"
+)
+@hedge_options
 @click.option(
-    "--output-dir",
-    type=click.Path(file_okay=False, dir_okay=True, writable=True, resolve_path=True),
-    default=None,
-    help="Directory to save downloaded image",
+    "--overwrite",
+    is_flag=True,
+    help="Process and download again even if the output file already exists",
+)
+@click.option(
+    "--dedupe", is_flag=True, help="Hardlink identical downloaded images to one copy"
 )
 def upscale(
-    file_path: str,
+    file_paths: Tuple[str, ...],
     mode: Optional[str],
-    timeout: int,
+    timeout: TimeoutTypes,
+    job_deadline: Optional[float],
+    converter: Optional[ImageConverter],
+    concurrency: int,
+    max_concurrency: Optional[int],
+    cpu_workers: Optional[int],
+    batch_deadline: Optional[float],
+    retries: int,
+    profiles: Tuple[str, ...],
+    all_profiles: bool,
     no_download: bool,
     output_dir: Optional[str],
+    to_stdout: bool,
+    hedge: Optional[HedgePolicy],
+    overwrite: bool,
+    dedupe: bool,
 ):
-    """Upscale an image with optional mode selection."""
-    click.echo(click.style("\n🖼️  Image Upscaling 🖼️", fg="bright_cyan", bold=True))
+    """Upscale one or more images with optional mode selection.
+
+    Use - as the only FILE_PATH to read the image from stdin.
+    """
+    # With --stdout, stdout carries the image so all messages go to stderr
+    err = to_stdout
+    click.echo(
+        click.style("\n🖼️  Image Upscaling 🖼️", fg="bright_cyan", bold=True), err=err
+    )
+    # Warm up the token and API connection while the user answers prompts
+    prewarm()
+
+    check_file_inputs(file_paths, to_stdout)
 
     if mode is None:
-        click.echo("\nChoose an upscaling method:")
+        if "-" in file_paths:
+            # stdin carries the image, so it can't answer the prompt
+            raise click.UsageError(
+                "--mode is required when reading the image from stdin"
+            )
+
+        click.echo("\nChoose an upscaling method:", err=err)
         click.echo(
-            click.style("1. Clarity Upscale ", fg="green") + "(Recommended, lower cost)"
+            click.style("1. Clarity Upscale ", fg="green") + "(Recommended, lower cost)",
+            err=err,
         )
         click.echo(
             click.style("2. Generative Upscale ", fg="yellow")
-            + "(Detailed, but ~20x more expensive)"
+            + "(Detailed, but ~20x more expensive)",
+            err=err,
         )
 
         choice = click.prompt(
             click.style("Enter your choice", fg="bright_blue"),
             type=click.Choice(["1", "2"]),
+            err=err,
         )
 
         if choice == "1":
@@ -56,29 +116,40 @@ def upscale(
                 "\n💸 Generative Upscale costs ~20x more. Are you sure you want to proceed?",
                 fg="bright_red",
             )
-            click.confirm(confirm_msg, abort=True)
+            click.confirm(confirm_msg, abort=True, err=err)
             mode = "generative"
 
-    try:
-        result = upscale_image(file_path, mode=mode, timeout=timeout)
-        if result:
-            success_msg = click.style(
-                f"\n✅ Image {mode} upscaled successfully: {result}", fg="bright_green"
-            )
-            click.echo(success_msg)
-
-            if not no_download:
-                # Generate custom filename with upscale mode suffix
-                original_filename = os.path.basename(file_path)
-                filename_base, ext = os.path.splitext(original_filename)
-
-                if mode == "generative":
-                    custom_filename = f"{filename_base}-upscaled-generative{ext}"
-                else:
-                    custom_filename = f"{filename_base}-upscaled{ext}"
-
-                download_image(result, output_dir, custom_filename)
+    def upscale_file(source, deadline: Deadline, token_pool) -> Optional[str]:
+        return upscale_image(
+            source,
+            mode=mode,
+            timeout=timeout,
+            deadline=deadline,
+            token_pool=token_pool,
+        )
 
-    except Exception as e:
-        error_msg = click.style(f"\n❌ Upscaling failed: {e}", fg="bright_red")
-        click.echo(error_msg)
+    run_file_batch(
+        file_paths,
+        upscale_file,
+        suffix="-upscaled-generative" if mode == "generative" else "-upscaled",
+        done_message=f"Image {mode} upscaled successfully",
+        skipped_message="Already upscaled",
+        failed_message="Upscaling {item} failed",
+        summary_message="Upscaled {succeeded} of {total} images.",
+        timeout=timeout,
+        job_deadline=job_deadline,
+        converter=converter,
+        concurrency=concurrency,
+        max_concurrency=max_concurrency,
+        cpu_workers=cpu_workers,
+        batch_deadline=batch_deadline,
+        retries=retries,
+        profiles=profiles,
+        all_profiles=all_profiles,
+        no_download=no_download,
+        output_dir=output_dir,
+        to_stdout=to_stdout,
+        hedge=hedge,
+        overwrite=overwrite,
+        dedupe=dedupe,
+    )
@@ -0,0 +1,116 @@
+import click
+import pytest
+
+from recraft.api_client.timeouts import DeadlineExceeded
+from recraft.commands import batch
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    """Write input images under tmp_path/in and return a path factory."""
+    (tmp_path / "in").mkdir()
+
+    def make(name, content=b"input"):
+        path = tmp_path / "in" / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(content)
+        return str(path)
+
+    return make
+
+
+@pytest.fixture
+def options(monkeypatch, tmp_path):
+    monkeypatch.setattr(batch, "build_token_pool", lambda *args: {})
+    return dict(
+        suffix="-done",
+        done_message="Done",
+        skipped_message="Already done",
+        failed_message="{item} failed",
+        summary_message="{succeeded} of {total}",
+        timeout=None,
+        job_deadline=None,
+        converter=None,
+        concurrency=1,
+        max_concurrency=None,
+        cpu_workers=0,
+        batch_deadline=None,
+        retries=1,
+        profiles=(),
+        all_profiles=False,
+        no_download=False,
+        output_dir=str(tmp_path / "out"),
+        to_stdout=False,
+        hedge=None,
+        overwrite=False,
+        dedupe=False,
+    )
+
+
+def test_download_cut_off_retries_only_the_download(
+    monkeypatch, tmp_path, inputs, options
+):
+    processed = []
+    downloads = []
+
+    def process(source, deadline, token_pool):
+        processed.append(source)
+        return "https://cdn.example/result.png"
+
+    def download_image(url, custom_filename=None, sink=None, **kwargs):
+        downloads.append(url)
+        if len(downloads) == 1:
+            raise DeadlineExceeded("job deadline")
+        return sink.write_stream(custom_filename, [b"image"])
+
+    monkeypatch.setattr(batch, "download_image", download_image)
+
+    source = inputs("x.png")
+    (result,) = batch.run_file_batch((source,), process, **options)
+
+    assert result.ok and result.attempts == 2
+    assert processed == [source]
+    assert downloads == ["https://cdn.example/result.png"] * 2
+    assert (tmp_path / "out" / "x-done.png").read_bytes() == b"image"
+
+
+def test_failed_job_exits_non_zero(tmp_path, options):
+    def process(source, deadline, token_pool):
+        return None if source.endswith("bad.png") else "https://cdn.example/x.png"
+
+    options["no_download"] = True
+    with click.Context(click.Command("upscale")):
+        with pytest.raises(click.exceptions.Exit) as exc_info:
+            batch.run_file_batch(("/in/ok.png", "/in/bad.png"), process, **options)
+
+    assert exc_info.value.exit_code == 1
+
+
+def test_skip_follows_input_content(monkeypatch, tmp_path, inputs, options):
+    processed = []
+
+    def process(source, deadline, token_pool):
+        processed.append(source)
+        return "https://cdn.example/result.png"
+
+    def download_image(url, custom_filename=None, sink=None, **kwargs):
+        return sink.write_stream(custom_filename, [b"image"])
+
+    monkeypatch.setattr(batch, "download_image", download_image)
+    source = inputs("x.png")
+
+    batch.run_file_batch((source,), process, **options)
+    batch.run_file_batch((source,), process, **options)
+    assert processed == [source]
+
+    # Same name, new content: processed again
+    inputs("x.png", b"edited")
+    batch.run_file_batch((source,), process, **options)
+    assert processed == [source, source]
+
+
+def test_same_output_name_in_one_batch_is_rejected(inputs, options):
+    first, second = inputs("a/x.png"), inputs("b/x.png")
+
+    with pytest.raises(click.UsageError, match="x-done.png"):
+        batch.run_file_batch((first, second), lambda *args: None, **options)
@@ -0,0 +1,69 @@
+import random
+
+import httpx
+import pytest
+
+from recraft.api_client.concurrency import AdaptiveLimiter
+from recraft.api_client.timeouts import DeadlineExceeded
+
+
+def complete(limiter, latency, status=200):
+    ticket = limiter.acquire()
+    ticket.status = status
+    limiter.release(ticket, latency if status < 400 else None)
+
+
+def test_latency_spread_under_flat_load_does_not_back_off():
+    limiter = AdaptiveLimiter(initial=8, maximum=32)
+    rng = random.Random(1)
+
+    for _ in range(2000):
+        complete(limiter, rng.uniform(2, 6))
+
+    assert limiter.decreases == 0
+    assert limiter.stats()["limit"] == 32
+
+
+def test_sustained_latency_rise_backs_off():
+    limiter = AdaptiveLimiter(initial=16, maximum=32)
+    rng = random.Random(1)
+    for _ in range(100):
+        complete(limiter, rng.uniform(2, 6))
+
+    for _ in range(30):
+        complete(limiter, 20.0)
+
+    assert limiter.decreases >= 1
+    assert limiter.stats()["limit"] < 16
+
+
+def test_throttle_halves_limit_once_per_round():
+    limiter = AdaptiveLimiter(initial=8, maximum=8)
+    tickets = [limiter.acquire() for _ in range(4)]
+
+    for ticket in tickets:
+        ticket.status = 429
+        limiter.release(ticket)
+
+    assert limiter.decreases == 1
+    assert limiter.stats()["limit"] == 4
+
+
+def test_own_deadline_is_not_congestion():
+    limiter = AdaptiveLimiter(initial=8, maximum=8)
+
+    with pytest.raises(DeadlineExceeded):
+        with limiter.slot():
+            raise DeadlineExceeded("job deadline")
+
+    assert limiter.decreases == 0
+
+
+def test_network_timeout_is_congestion():
+    limiter = AdaptiveLimiter(initial=8, maximum=8)
+
+    with pytest.raises(httpx.ReadTimeout):
+        with limiter.slot():
+            raise httpx.ReadTimeout("slow")
+
+    assert limiter.decreases == 1
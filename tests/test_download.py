@@ -0,0 +1,98 @@
+import io
+
+import httpx
+import pytest
+
+from recraft.api_client import download, download_image
+from recraft.api_client.hedge import HedgePolicy
+
+IMAGE = b"\x89PNG\r\n\x1a\n" + b"\x00" * 4096
+
+
+@pytest.fixture
+def cdn(monkeypatch):
+    """Serve IMAGE for every request from a mock transport, counting requests."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.url.path.endswith("missing.png"):
+            return httpx.Response(404)
+        return httpx.Response(200, content=IMAGE)
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(download, "get_client", lambda: client)
+    yield requests
+    client.close()
+
+
+def test_download_image_writes_file(cdn, tmp_path):
+    path = download_image("https://cdn.example/x.png", str(tmp_path))
+
+    assert path == str(tmp_path / "x.png")
+    assert (tmp_path / "x.png").read_bytes() == IMAGE
+    assert list(tmp_path.iterdir()) == [tmp_path / "x.png"]
+
+
+def test_download_image_with_hedge_policy(cdn, tmp_path):
+    path = download_image(
+        "https://cdn.example/x.png", str(tmp_path), hedge=HedgePolicy()
+    )
+
+    assert (tmp_path / "x.png").read_bytes() == IMAGE
+    assert path == str(tmp_path / "x.png")
+
+
+def test_download_image_skips_existing(cdn, tmp_path):
+    (tmp_path / "x.png").write_bytes(b"existing")
+
+    path = download_image(
+        "https://cdn.example/x.png", str(tmp_path), skip_existing=True
+    )
+
+    assert path == str(tmp_path / "x.png")
+    assert (tmp_path / "x.png").read_bytes() == b"existing"
+    assert cdn == []
+
+
+def test_download_image_http_error(cdn, tmp_path):
+    assert download_image("https://cdn.example/missing.png", str(tmp_path)) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_download_image_converts_raster(monkeypatch, tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    from recraft.api_client.convert import ImageConverter
+
+    png = io.BytesIO()
+    Image.new("RGBA", (8, 8), (255, 0, 0, 128)).save(png, format="PNG")
+    content = png.getvalue()
+    client = httpx.Client(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, content=content))
+    )
+    monkeypatch.setattr(download, "get_client", lambda: client)
+
+    path = download_image(
+        "https://cdn.example/x.png", str(tmp_path), converter=ImageConverter("jpeg")
+    )
+
+    assert path == str(tmp_path / "x.jpg")
+    assert (tmp_path / "x.jpg").read_bytes().startswith(b"\xff\xd8")
+
+
+def test_download_image_keeps_vector_unconverted(monkeypatch, tmp_path):
+    pytest.importorskip("PIL.Image")
+    from recraft.api_client.convert import ImageConverter
+
+    svg = b'<svg xmlns="http://www.w3.org/2000/svg"/>'
+    client = httpx.Client(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, content=svg))
+    )
+    monkeypatch.setattr(download, "get_client", lambda: client)
+
+    path = download_image(
+        "https://cdn.example/x.svg", str(tmp_path), converter=ImageConverter("webp")
+    )
+
+    assert path == str(tmp_path / "x.svg")
+    assert (tmp_path / "x.svg").read_bytes() == svg
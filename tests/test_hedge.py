@@ -0,0 +1,28 @@
+import threading
+
+import httpx
+
+from recraft.api_client.hedge import HedgePolicy, hedged_send
+
+
+def test_winning_hedge_records_its_own_latency():
+    release = threading.Event()
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            # The primary stalls until the hedge has won
+            release.wait(5)
+        return httpx.Response(200, content=b"image")
+
+    policy = HedgePolicy(initial_delay=0.3)
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        request = client.build_request("GET", "https://cdn.example/x.png")
+        response = hedged_send(client, request, policy)
+        response.close()
+        release.set()
+
+    assert policy.metrics() == {"requests": 1, "hedges_fired": 1, "hedges_won": 1}
+    # Timed from the hedge's own send, not the primary's
+    assert policy._latencies[0] < 0.3
@@ -0,0 +1,134 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from recraft.api_client.sinks import LocalDirSink, S3Sink
+
+
+class ClientError(Exception):
+    def __init__(self, code):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+
+class FakeS3:
+    """Records the calls an S3Sink makes, like a boto3 client would receive them."""
+
+    exceptions = SimpleNamespace(ClientError=ClientError)
+
+    def __init__(self, fail_on_part=None, keys=()):
+        self.calls = []
+        self.parts = []
+        self.fail_on_part = fail_on_part
+        self.keys = set(keys)
+
+    def put_object(self, **kwargs):
+        self.calls.append(("put_object", kwargs))
+
+    def create_multipart_upload(self, **kwargs):
+        self.calls.append(("create_multipart_upload", kwargs))
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, **kwargs):
+        if kwargs["PartNumber"] == self.fail_on_part:
+            raise ConnectionError("connection reset")
+        self.calls.append(("upload_part", kwargs))
+        self.parts.append(kwargs["Body"])
+        return {"ETag": f"etag-{kwargs['PartNumber']}"}
+
+    def complete_multipart_upload(self, **kwargs):
+        self.calls.append(("complete_multipart_upload", kwargs))
+
+    def abort_multipart_upload(self, **kwargs):
+        self.calls.append(("abort_multipart_upload", kwargs))
+
+    def head_object(self, **kwargs):
+        if kwargs["Key"].endswith("forbidden.png"):
+            raise ClientError("403")
+        if kwargs["Key"] not in self.keys:
+            raise ClientError("404")
+        return {}
+
+    def names(self):
+        return [name for name, _ in self.calls]
+
+
+def test_small_image_uses_a_single_put():
+    client = FakeS3()
+    sink = S3Sink("bucket", "/out/", part_size=8, client=client)
+
+    location = sink.write_stream("x.png", [b"abc", b"de"])
+
+    assert location == "s3://bucket/out/x.png"
+    assert client.calls == [
+        ("put_object", {"Bucket": "bucket", "Key": "out/x.png", "Body": b"abcde"})
+    ]
+
+
+def test_large_image_is_split_into_parts():
+    client = FakeS3()
+    sink = S3Sink("bucket", part_size=4, client=client)
+
+    sink.write_stream("x.png", [b"abc", b"defgh", b"ij"])
+
+    assert client.names() == [
+        "create_multipart_upload",
+        "upload_part",
+        "upload_part",
+        "complete_multipart_upload",
+    ]
+    assert client.parts == [b"abcdefgh", b"ij"]
+    assert client.calls[-1][1]["MultipartUpload"] == {
+        "Parts": [
+            {"ETag": "etag-1", "PartNumber": 1},
+            {"ETag": "etag-2", "PartNumber": 2},
+        ]
+    }
+
+
+def test_failed_upload_is_aborted():
+    client = FakeS3(fail_on_part=2)
+    sink = S3Sink("bucket", part_size=4, client=client)
+
+    with pytest.raises(ConnectionError):
+        sink.write_stream("x.png", [b"abcd", b"efgh"])
+
+    assert client.names() == [
+        "create_multipart_upload",
+        "upload_part",
+        "abort_multipart_upload",
+    ]
+    assert client.calls[-1][1]["UploadId"] == "upload-1"
+
+
+def test_exists_treats_only_404_as_missing():
+    client = FakeS3(keys={"out/x.png"})
+    sink = S3Sink("bucket", "out", client=client)
+
+    assert sink.exists("x.png")
+    assert not sink.exists("y.png")
+    with pytest.raises(ClientError):
+        sink.exists("forbidden.png")
+
+
+def test_dedupe_links_identical_images(tmp_path):
+    sink = LocalDirSink(str(tmp_path), dedupe=True)
+
+    sink.write_stream("a.png", [b"image"])
+    sink.write_stream("b.png", [b"image"])
+
+    assert os.path.samefile(tmp_path / "a.png", tmp_path / "b.png")
+
+
+def test_dedupe_replaces_a_modified_object(tmp_path):
+    sink = LocalDirSink(str(tmp_path), dedupe=True)
+    sink.write_stream("a.png", [b"image"])
+    # Editing a.png in place also changes the stored object it is linked to
+    (tmp_path / "a.png").write_bytes(b"edited")
+
+    sink.write_stream("b.png", [b"image"])
+
+    assert (tmp_path / "b.png").read_bytes() == b"image"
+    assert (tmp_path / "a.png").read_bytes() == b"edited"
+    assert not os.path.samefile(tmp_path / "a.png", tmp_path / "b.png")
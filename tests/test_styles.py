@@ -0,0 +1,65 @@
+import httpx
+import pytest
+
+from recraft.api_client import styles
+from recraft.api_client.styles import StyleRegistry
+
+ILLUSTRATION_ID = "229b2a75-05e4-4580-85f9-b47ee521a00d"
+VECTOR_ID = "5c3b6c0a-1f4e-4bd3-9d6d-8a1c9d2f0e11"
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(styles, "cache_path", lambda: str(tmp_path / "styles.json"))
+    styles.get_style_registry.cache_clear()
+    yield
+    styles.get_style_registry.cache_clear()
+
+
+def test_with_prefix_keeps_catalogue_order():
+    registry = StyleRegistry(["b_two", "a", "b_one", "b", "c"])
+
+    assert registry.with_prefix("b") == ["b_two", "b_one", "b"]
+    assert registry.with_prefix("b_o") == ["b_one"]
+    assert registry.with_prefix("z") == []
+
+
+def test_refresh_adds_custom_styles(cache, monkeypatch):
+    catalogue = {
+        "styles": [
+            {"id": ILLUSTRATION_ID, "style": "digital_illustration"},
+            {"id": VECTOR_ID, "style": "vector_illustration"},
+        ]
+    }
+    monkeypatch.setattr(
+        styles.httpx, "get", lambda *args, **kwargs: _response(catalogue)
+    )
+
+    registry = styles.refresh_styles("token")
+
+    assert ILLUSTRATION_ID in registry
+    assert registry.is_custom(ILLUSTRATION_ID)
+    assert registry.base_style(VECTOR_ID) == "vector_illustration"
+    assert not registry.is_custom("digital_illustration")
+
+    # The custom styles survive a reload from the cache
+    styles.get_style_registry.cache_clear()
+    assert styles.get_style_registry().is_custom(ILLUSTRATION_ID)
+
+
+def _response(payload):
+    request = httpx.Request("GET", styles.STYLES_CATALOGUE_URL)
+    return httpx.Response(200, json=payload, request=request)
+
+
+def test_picker_offers_custom_styles(cache):
+    from recraft.commands.generate import style_categories
+
+    styles._write_cache([], {ILLUSTRATION_ID: "digital_illustration"})
+
+    categories = style_categories()
+    custom = categories[str(len(categories))]
+
+    assert custom["name"] == "Custom"
+    assert custom["styles"] == [ILLUSTRATION_ID]
+    assert custom["labels"] == [f"{ILLUSTRATION_ID} (digital_illustration)"]
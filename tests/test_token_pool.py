@@ -0,0 +1,66 @@
+import io
+import time
+
+import httpx
+import pytest
+
+from recraft.api_client import base
+from recraft.api_client.timeouts import Deadline, DeadlineExceeded
+from recraft.api_client.token_pool import TokenPool
+
+ENDPOINT = "https://api.example/v1/images/removeBackground"
+IMAGE = b"\x89PNG\r\n\x1a\n" + b"\x00" * 1024
+
+
+class PipeStream(io.BytesIO):
+    """A one-shot stream, like stdin connected to a pipe."""
+
+    def seekable(self):
+        return False
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """Throttle token "a" and accept token "b", recording upload sizes per token."""
+    uploads = []
+
+    def handler(request):
+        token = request.headers["Authorization"].split()[-1]
+        uploads.append((token, len(request.read())))
+        if token == "a":
+            return httpx.Response(429, headers={"Retry-After": "30"})
+        return httpx.Response(200, json={"image": {"url": "https://cdn/x.png"}})
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(base, "get_client", lambda: client)
+    yield uploads
+    client.close()
+
+
+def test_seekable_stream_is_rewound_for_retry(api):
+    pool = TokenPool({"a": "a", "b": "b"})
+
+    result = base.process_image(io.BytesIO(IMAGE), ENDPOINT, "Test", token_pool=pool)
+
+    assert result == "https://cdn/x.png"
+    assert [token for token, _ in api] == ["a", "b"]
+    assert api[0][1] == api[1][1]
+
+
+def test_one_shot_stream_is_not_retried(api):
+    pool = TokenPool({"a": "a", "b": "b"})
+
+    result = base.process_image(PipeStream(IMAGE), ENDPOINT, "Test", token_pool=pool)
+
+    assert result is None
+    assert [token for token, _ in api] == ["a"]
+
+
+def test_acquire_respects_deadline():
+    pool = TokenPool({"a": "a"})
+    pool.release(pool.acquire(), 429, retry_after="60")
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        pool.acquire(Deadline(0.1))
+    assert time.monotonic() - start < 1